@@ -1,14 +1,15 @@
+import re
 import subprocess
 import sys
 import textwrap
 import time
 import json
-import shutil
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 import traceback
 
+from utils import discard_directory
 from constants import (
     ROOT,
     MAIN_SCRIPT,
@@ -51,13 +52,18 @@ def run_subprocess(cmd: List[str], cwd: Path, timeout: Optional[int] = None) ->
         )
 
 
+# All step markers fused into one alternation, so a log is scanned once
+# rather than once per step.
+_MARKER_STEPS = {marker: step for step, marker in STEP_MARKERS.items()}
+_STEP_MARKER_RE = re.compile("|".join(re.escape(marker) for marker in _MARKER_STEPS))
+
+
 def detect_last_step(log_text: str) -> int:
     """Detect the highest step number that appears in the main.py log."""
-    last_step = 0
-    for step, marker in STEP_MARKERS.items():
-        if marker in log_text:
-            last_step = max(last_step, step)
-    return last_step
+    return max(
+        (_MARKER_STEPS[m.group(0)] for m in _STEP_MARKER_RE.finditer(log_text)),
+        default=0,
+    )
 
 
 def extract_last_error_line(log_text: str) -> str:
@@ -120,12 +126,11 @@ def extract_repo_name(log_text: str) -> Optional[str]:
 
 def cleanup_tmp_directory():
     """Clean up tmp/ directory between runs."""
-    if TMP_DIR.exists():
-        try:
-            shutil.rmtree(TMP_DIR)
+    try:
+        if discard_directory(TMP_DIR):
             print(f"  [CLEANUP] Removed tmp/ directory")
-        except Exception as e:
-            print(f"  [WARNING] Could not fully clean tmp/: {e}")
+    except Exception as e:
+        print(f"  [WARNING] Could not fully clean tmp/: {e}")
 
 
 def run_main_for_url(url: str, index: int, total: int) -> Dict[str, Any]:
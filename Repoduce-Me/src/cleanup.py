@@ -14,13 +14,13 @@ python cleanup.py --tmp --workspace
 """
 
 import argparse
-import shutil
 from pathlib import Path
 
 from constants import (
     TMP_DIR, 
     WORKSPACE_DIR, 
 )
+from utils import fast_rmtree
 
 def wipe(path: Path):
     if not path.exists():
@@ -28,7 +28,7 @@ def wipe(path: Path):
         return
 
     print(f"[CLEANUP] Removing directory: {path}")
-    shutil.rmtree(path)
+    fast_rmtree(path)
     print(f"[DONE] Removed: {path}")
 
 
@@ -1,6 +1,6 @@
 from __future__ import annotations
+import os
 from typing import List
-from math import random
 
 from pathlib import Path
 
@@ -17,6 +17,16 @@ REPO_DIR = TMP_DIR / "repo"
 VENV_DIR = TMP_DIR / ".venv_repro"
 WORKSPACE_DIR = ROOT / "workspace"
 
+# Kept outside TMP_DIR so cached wheels, scan results and LLM answers survive cleanup between
+# runs; batch_eval wipes tmp/ before every paper.
+PIP_CACHE_DIR = Path(os.environ.get(
+    "REPRODUCE_PIP_CACHE", Path.home() / ".cache" / "reproduce-me" / "pip"
+))
+SCAN_CACHE_DIR = Path.home() / ".cache" / "reproduce-me" / "scan"
+LLM_CACHE_DIR = Path.home() / ".cache" / "reproduce-me" / "llm"
+# Seconds a cached LLM answer is reused before the model is asked again
+LLM_CACHE_TTL = 7 * 24 * 60 * 60
+
 DEMO_FILENAME = "generated_demo.py"
 
 LOG_DIR = ROOT / "batch_logs"
@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import sys
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, Optional
 
@@ -55,14 +56,35 @@ class ConstructorModel:
             **kwargs,
         )
 
-    def invoke(self, prompt: str, **kwargs: Any):
+    def invoke(self, prompt: Any, **kwargs: Any):
         """
         Synchronous call: returns a ChatMessage-like object with `.content`.
+
+        `prompt` is a string or a list of (role, content) messages.
         """
         return self.client.invoke(prompt, **kwargs)
 
-    async def ainvoke(self, prompt: str, **kwargs: Any):
+    def stream(self, prompt: Any, **kwargs: Any):
+        """
+        Streaming call: yields message chunks with `.content` as they arrive.
+        Closing the iterator early stops the request.
+        """
+        return self.client.stream(prompt, **kwargs)
+
+    async def ainvoke(self, prompt: Any, **kwargs: Any):
         """
         Async variant if you ever need it.
         """
-        return await self.client.ainvoke(prompt, **kwargs)
\ No newline at end of file
+        return await self.client.ainvoke(prompt, **kwargs)
+
+
+@lru_cache(maxsize=None)
+def get_model(model: Optional[str] = None) -> ConstructorModel:
+    """
+    Shared ConstructorModel for `model`, built on first use.
+
+    Building one opens a Constructor chat session and fetches the LLM list,
+    so the paper parser and demo creator reuse a single instance (and its
+    HTTP connection pool) instead of each paying for that setup.
+    """
+    return ConstructorModel(model=model)
@@ -7,11 +7,56 @@ from a cloned repository, primarily based on its README and examples.
 
 from __future__ import annotations
 
-import re
 from pathlib import Path
-from typing import Optional, Set, List, Any
-
-from constructor_model import ConstructorModel
+from typing import TYPE_CHECKING, Optional, Set, List, Any, Tuple
+
+from utils import drop_llm_cache, llm_cache_key, read_llm_cache, write_llm_cache
+
+if TYPE_CHECKING:
+    from constructor_model import ConstructorModel
+
+
+# Identical for every repository, so it is sent as its own system message: the
+# shared prefix lets the provider's prompt cache skip reprocessing it.
+_DEMO_INSTRUCTIONS = "\n".join([
+    "You are an AI assistant that generates **runnable Python demo scripts** ",
+    "for scientific and simulation code repositories.",
+    "",
+    "You are given the repository README and (optionally) some example scripts.",
+    "",
+    "Your task is to produce ONE self-contained Python file that demonstrates a",
+    "**realistic end-to-end workflow**, not just a trivial function call.",
+    "",
+    "Requirements for the demo script:",
+    "- Output **only valid Python source code**. No markdown, no backticks, no prose.",
+    "- The script must be runnable as `python demo.py` after the user installs the repo's dependencies.",
+    "- CRITICAL: Only import packages that are either:",
+    "  1. Part of Python's standard library (os, sys, pathlib, json, etc.)",
+    "  2. Listed in the INSTALLED PACKAGES section of the request",
+    "- Prefer using the public API (importing the installed package) instead of private internals.",
+    "- Show a sequence of meaningful steps (e.g., model/set up a system, run a calculation/simulation, ",
+    "  compute a couple of properties, and print or save results).",
+    "- Use a `if __name__ == \"__main__\":` block to orchestrate the workflow.",
+    "- Add concise comments explaining the high-level workflow, not wall-of-text commentary.",
+    "",
+    "If the README and examples suggest using environment variables or a working directory, you MAY:",
+    "- Read a few key environment variables with sensible defaults (e.g. SMILES strings, IDs, temp, pressure).",
+    "- Create a working directory like `./{DBID}` and a subdirectory like `analyze/` for results.",
+    "- Write CSV / JSON / text outputs with key results.",
+    "",
+    "If the project is about simulations (e.g. polymers, MD, QM, etc.),",
+    "aim to demonstrate a **mini pipeline** such as:",
+    "- build or load a system (e.g. from SMILES or input data),",
+    "- set up force fields / parameters,",
+    "- run a small simulation or calculation,",
+    "- compute and print/save a few physically meaningful properties.",
+    "",
+    "Avoid:",
+    "- Overly long, 300+ line scripts; keep it focused but realistic.",
+    "- Copy-pasting whole example files verbatim.",
+    "- Relying on external shell scripts or complex job schedulers.",
+    "- Importing packages that are NOT in the installed packages list.",
+])
 
 
 class DemoCreator:
@@ -20,6 +65,8 @@ class DemoCreator:
     from a cloned repository, primarily based on its README and examples.
     """
 
+    LLM_MODEL = "gpt-5.1"
+
     def __init__(
         self,
         repo_path: Any,
@@ -47,6 +94,7 @@ class DemoCreator:
         self.installed_packages: Set[str] = self._normalize_packages(installed_packages)
 
         self._llm: Optional[ConstructorModel] = None
+        self._cache_key: Optional[str] = None
 
     def _normalize_packages(self, packages: Any) -> Set[str]:
         """Convert any input to a set of strings safely."""
@@ -71,7 +119,10 @@ class DemoCreator:
     def llm(self) -> ConstructorModel:
         """Lazy initialization of the LLM."""
         if self._llm is None:
-            self._llm = ConstructorModel(model="gpt-5.1")
+            # Imported here: the LLM client stack is slow to load and only
+            # needed once a demo is actually requested.
+            from constructor_model import get_model
+            self._llm = get_model(self.LLM_MODEL)
         return self._llm
 
 
@@ -103,21 +154,33 @@ class DemoCreator:
 
         prompt = self._build_prompt(readme_text, example_snippets)
 
-        print("[INFO] Calling Constructor LLM to generate demo code...")
-        try:
-            response = self.llm.invoke(prompt)
-        except Exception as e:
-            print(f"[ERROR] LLM invocation failed: {type(e).__name__} - {e}")
-            print("=== DEMO GENERATION: FAILED DURING LLM CALL ===")
-            return None
+        # The same README, examples and packages give the same prompt, so a
+        # re-run on an unchanged repository reuses the earlier answer (until it
+        # expires, is bypassed with --no-llm-cache, or forget_cached_demo drops it).
+        cache_key = llm_cache_key(self.LLM_MODEL, prompt)
+        self._cache_key = cache_key
+        raw_response = read_llm_cache(cache_key)
+        from_cache = raw_response is not None
+        if from_cache:
+            print("[INFO] Reusing cached demo code for this prompt.")
+        else:
+            print("[INFO] Calling Constructor LLM to generate demo code...")
+            try:
+                raw_response = self._request_demo_code(prompt)
+            except Exception as e:
+                print(f"[ERROR] LLM invocation failed: {type(e).__name__} - {e}")
+                print("=== DEMO GENERATION: FAILED DURING LLM CALL ===")
+                return None
 
-        raw_response = getattr(response, "content", str(response))
         demo_code = self._extract_code(raw_response)
         if not demo_code or len(demo_code.strip()) == 0:
             print("[ERROR] LLM response did not contain any recognizable Python code.")
             print("=== DEMO GENERATION: FAILED (EMPTY CODE) ===")
             return None
 
+        if not from_cache:
+            write_llm_cache(cache_key, raw_response)
+
         try:
             self._write_demo(demo_code)
         except Exception as e:
@@ -130,6 +193,43 @@ class DemoCreator:
         return self.output_path
 
 
+    def forget_cached_demo(self) -> None:
+        """
+        Drop the cached answer behind the last generated demo, e.g. after the
+        demo failed to run, so the next run asks the LLM again.
+        """
+        if self._cache_key is not None:
+            drop_llm_cache(self._cache_key)
+
+    def _request_demo_code(self, prompt: List[Tuple[str, str]]) -> str:
+        """
+        Stream the LLM reply and return its text.
+
+        Only the first fenced block is used, so once its closing fence arrives
+        the stream is closed and whatever explanation the model adds after it
+        is neither waited for nor generated.
+        """
+        chunks: List[str] = []
+        fences = 0
+        tail = ""
+        stream = self.llm.stream(prompt)
+        try:
+            for chunk in stream:
+                piece = getattr(chunk, "content", chunk)
+                if not isinstance(piece, str):
+                    piece = str(piece)
+                chunks.append(piece)
+                # Carry two characters over so a fence split across chunks is still seen
+                fences += (tail + piece).count("```")
+                tail = (tail + piece)[-2:]
+                if fences >= 2:
+                    break
+        finally:
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+        return "".join(chunks)
+
     def _load_readme(self) -> Optional[str]:
         """
         Finds and loads README.* in repo root. Returns truncated content.
@@ -145,17 +245,19 @@ class DemoCreator:
         if not readme_path:
             return None
 
+        max_chars: int = int(self.max_readme_chars)
+
+        # Only the first max_chars characters are used, so stop reading there;
+        # the one extra character tells whether anything was cut off.
         try:
-            text = readme_path.read_text(encoding="utf-8", errors="ignore")
+            with readme_path.open(encoding="utf-8", errors="ignore") as f:
+                text = f.read(max_chars + 1)
         except Exception as e:
             print(f"[ERROR] Failed to read README: {e}")
             return None
 
-        text_len: int = len(text)
-        max_chars: int = int(self.max_readme_chars)
-        
-        if text_len > max_chars:
-            print(f"[INFO] Truncating README from {text_len} -> {max_chars} chars.")
+        if len(text) > max_chars:
+            print(f"[INFO] Truncating README ({readme_path.stat().st_size} bytes) -> {max_chars} chars.")
             text = text[:max_chars]
 
         return text
@@ -218,10 +320,13 @@ class DemoCreator:
 
         return "\n\n".join(snippets)
 
-    def _build_prompt(self, readme: str, example_snippets: str) -> str:
+    def _build_prompt(self, readme: str, example_snippets: str) -> List[Tuple[str, str]]:
         """
         Constructs an instruction for Constructor to output a concrete,
         end-to-end demo script, with awareness of installed packages.
+
+        Returns chat messages: the fixed instructions as the system message
+        and the repository-specific material as the user message.
         """
         repo_name = self.repo_path.name
 
@@ -250,48 +355,10 @@ class DemoCreator:
             )
 
         prompt_parts: List[str] = [
-            "You are an AI assistant that generates **runnable Python demo scripts** ",
-            "for scientific and simulation code repositories.",
-            "",
             f"Repository name: {repo_name}",
             "",
             packages_info,
             "",
-            "You are given the repository README and (optionally) some example scripts.",
-            "",
-            "Your task is to produce ONE self-contained Python file that demonstrates a",
-            "**realistic end-to-end workflow**, not just a trivial function call.",
-            "",
-            "Requirements for the demo script:",
-            "- Output **only valid Python source code**. No markdown, no backticks, no prose.",
-            "- The script must be runnable as `python demo.py` after the user installs the repo's dependencies.",
-            "- CRITICAL: Only import packages that are either:",
-            "  1. Part of Python's standard library (os, sys, pathlib, json, etc.)",
-            "  2. Listed in the INSTALLED PACKAGES section above",
-            "- Prefer using the public API (importing the installed package) instead of private internals.",
-            "- Show a sequence of meaningful steps (e.g., model/set up a system, run a calculation/simulation, ",
-            "  compute a couple of properties, and print or save results).",
-            "- Use a `if __name__ == \"__main__\":` block to orchestrate the workflow.",
-            "- Add concise comments explaining the high-level workflow, not wall-of-text commentary.",
-            "",
-            "If the README and examples suggest using environment variables or a working directory, you MAY:",
-            "- Read a few key environment variables with sensible defaults (e.g. SMILES strings, IDs, temp, pressure).",
-            "- Create a working directory like `./{DBID}` and a subdirectory like `analyze/` for results.",
-            "- Write CSV / JSON / text outputs with key results.",
-            "",
-            "If the project is about simulations (e.g. polymers, MD, QM, etc.),",
-            "aim to demonstrate a **mini pipeline** such as:",
-            "- build or load a system (e.g. from SMILES or input data),",
-            "- set up force fields / parameters,",
-            "- run a small simulation or calculation,",
-            "- compute and print/save a few physically meaningful properties.",
-            "",
-            "Avoid:",
-            "- Overly long, 300+ line scripts; keep it focused but realistic.",
-            "- Copy-pasting whole example files verbatim.",
-            "- Relying on external shell scripts or complex job schedulers.",
-            "- Importing packages that are NOT in the installed packages list above.",
-            "",
             "README CONTENT START",
             "--------------------",
             readme,
@@ -316,19 +383,23 @@ class DemoCreator:
             "CRITICAL: Only use imports from the INSTALLED PACKAGES list or Python standard library."
         ]
 
-        return "\n".join(prompt_parts)
+        return [("system", _DEMO_INSTRUCTIONS), ("human", "\n".join(prompt_parts))]
 
     def _extract_code(self, raw_response: str) -> str:
         """
         Removes markdown fences if the model still wraps output in ```python ``` etc.
         """
-        if "```" not in raw_response:
+        start = raw_response.find("```")
+        if start == -1:
+            return raw_response
+        end = raw_response.find("```", start + 3)
+        if end == -1:
             return raw_response
 
-        match = re.search(r"```(?:python)?\s*(.*?)```", raw_response, re.DOTALL | re.IGNORECASE)
-        if match:
-            return match.group(1)
-        return raw_response
+        code = raw_response[start + 3:end]
+        if code[:6].lower() == "python":
+            code = code[6:]
+        return code.lstrip()
 
     def _write_demo(self, code: str) -> None:
         self.output_path.write_text(code, encoding="utf-8")
\ No newline at end of file
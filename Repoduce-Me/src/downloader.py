@@ -7,6 +7,15 @@ from typing import Optional
 import urllib.request
 from pathlib import Path
 
+# Size of each read while streaming a PDF to disk.
+PDF_CHUNK_SIZE = 256 * 1024
+
+# How much of a PDF to fetch when probing it for a GitHub link.
+PDF_PROBE_BYTES = 512 * 1024
+
+# Seconds a PDF request may wait on the server before it is abandoned.
+PDF_TIMEOUT = 60
+
 class Downloader:
     """
     A utility class to clone a GitHub repository and download PDFs.
@@ -124,12 +133,12 @@ class Downloader:
 
         for attempt in range(1, self.max_retries + 1):
             try:
-                with urllib.request.urlopen(pdf_url) as response:
+                with urllib.request.urlopen(pdf_url, timeout=PDF_TIMEOUT) as response:
                     if response.status != 200:
                         raise OSError(f"HTTP status {response.status}")
 
                     with open(output_path, "wb") as f:
-                        shutil.copyfileobj(response, f)
+                        shutil.copyfileobj(response, f, PDF_CHUNK_SIZE)
 
                 print(f"PDF successfully downloaded on attempt {attempt}.")
                 return True
@@ -145,4 +154,26 @@ class Downloader:
                     print(
                         f"Error downloading PDF after {self.max_retries} attempts: {e}"
                     )
-                return False
\ No newline at end of file
+        return False
+
+    def fetch_pdf_prefix(self, pdf_url: str, num_bytes: int = PDF_PROBE_BYTES) -> bytes:
+        """
+        Fetch only the first `num_bytes` of a PDF using an HTTP range request.
+
+        Servers that ignore the Range header answer with the whole document; in
+        that case only `num_bytes` are read before the connection is closed.
+        Returns b"" on any failure so the caller can fall back to a full download.
+        """
+        request = urllib.request.Request(
+            pdf_url,
+            headers={"Range": f"bytes=0-{num_bytes - 1}"},
+        )
+
+        try:
+            with urllib.request.urlopen(request, timeout=PDF_TIMEOUT) as response:
+                if response.status not in (200, 206):
+                    return b""
+                return response.read(num_bytes)
+        except Exception as e:
+            print(f"Could not fetch PDF prefix from '{pdf_url}': {type(e).__name__} - {e}")
+            return b""
\ No newline at end of file
@@ -15,16 +15,23 @@ import sys
 import argparse
 import shutil
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Set
+from typing import List, Set
 
 from downloader import Downloader
 from paper_extracter import PaperParser
 from requirements_extract import RequirementsExtractor
-from venv_create import setup_venv_and_install, get_venv_python
+from venv_create import (
+    setup_venv_and_install,
+    prepare_virtual_environment,
+    get_venv_python,
+    requirements_satisfied,
+    venv_has_install_key,
+)
 from demo_creator import DemoCreator
 
-from utils import get_installed_packages, clone_repository, run_demo
+from utils import get_installed_packages, clone_repository, run_demo, StepLogger
 
 from constants import (
     TMP_DIR, 
@@ -72,6 +79,22 @@ def main():
         default=None,
         help="Python executable to use for creating the virtual environment"
     )
+    parser.add_argument(
+        "--reuse-host-packages",
+        action="store_true",
+        help="Let the venv see the host interpreter's site-packages, skipping reinstalls of "
+             "numpy/scipy when the host versions match the repository (weakens isolation)"
+    )
+    parser.add_argument(
+        "--no-shared-cache",
+        action="store_true",
+        help="Don't use the wheel/HTTP cache shared between runs when installing"
+    )
+    parser.add_argument(
+        "--no-llm-cache",
+        action="store_true",
+        help="Ask the LLM again instead of reusing cached answers (fresh answers replace them)"
+    )
     parser.add_argument(
         "--no-cleanup",
         action="store_true",
@@ -80,6 +103,15 @@ def main():
     
     args = parser.parse_args()
     
+    if args.no_shared_cache:
+        # Read by pip and uv in every install subprocess
+        os.environ["PIP_NO_CACHE_DIR"] = "1"
+        os.environ["UV_NO_CACHE"] = "1"
+    
+    if args.no_llm_cache:
+        # Read by utils.read_llm_cache
+        os.environ["REPRODUCE_NO_LLM_CACHE"] = "1"
+    
     work_dir = TMP_DIR if args.tmp else WORKSPACE_DIR
     
     os.makedirs(work_dir, exist_ok=True)
@@ -90,43 +122,71 @@ def main():
     
     demo_path = os.path.join(repo_dir, DEMO_FILENAME)
     
-    print(f"\n--- Starting Pipeline Execution with Input: {args.input} ---")
+    # Without --python, a repository whose requirements the current interpreter
+    # already satisfies runs there instead of in a new venv. --tmp runs are
+    # driven by batch_eval, which always runs the demo with tmp/.venv_repro,
+    # so they keep to the project venv.
+    allow_current_env = args.python is None and not args.tmp
+    
+    log = StepLogger()
+    log(f"\n--- Starting Pipeline Execution with Input: {args.input} ---")
     
     try:
         # ============================================================
         # STEP 1: Resolve input to local PDF
         # ============================================================
         input_path = args.input
+        prefix_links: List[str] = []
         
         if input_path.startswith(('http://', 'https://')):
-            print("--- STEP 1: Input is a URL. Downloading PDF... ---")
+            log("--- STEP 1: Input is a URL. Downloading PDF... ---")
             
             downloader = Downloader(target_dir=work_dir_abs)
             pdf_path = os.path.join(work_dir_abs, "downloaded_paper.pdf")
             
-            success = downloader.download_pdf(input_path, pdf_path)
-            if not success:
-                raise RuntimeError(f"Failed to download PDF from {input_path}")
-            print(f"PDF successfully downloaded on attempt 1.\n")
+            if not args.github:
+                # Most papers link their repository on the first page, so try
+                # the start of the file before paying for the full download.
+                log.flush()
+                prefix = downloader.fetch_pdf_prefix(input_path)
+                prefix_links = PaperParser.extract_github_link_from_bytes(prefix)
+                # Link annotations come in file order, not reading order, so with
+                # several candidates the first may be a cited project rather than
+                # the paper's own code; only an unambiguous link skips the parse.
+                if len(prefix_links) != 1:
+                    prefix_links = []
+            
+            if prefix_links:
+                log(f"[INFO] GitHub link found in the first {len(prefix)} bytes; skipping full download.\n")
+            else:
+                log.flush()
+                success = downloader.download_pdf(input_path, pdf_path)
+                if not success:
+                    raise RuntimeError(f"Failed to download PDF from {input_path}")
+                log(f"PDF successfully downloaded on attempt 1.\n")
         else:
-            print("--- STEP 1: Input is a local file. ---")
+            log("--- STEP 1: Input is a local file. ---")
             if not os.path.exists(input_path):
                 raise FileNotFoundError(f"PDF file not found: {input_path}")
             pdf_path = os.path.abspath(input_path)
-            print(f"[INFO] Using local PDF: {pdf_path}\n")
+            log(f"[INFO] Using local PDF: {pdf_path}\n")
         
         # ============================================================
         # STEP 2: Extract GitHub URL from PDF (or use provided URL)
         # ============================================================
-        print("--- STEP 2: Parsing PDF for GitHub Repository URL... ---")
+        log("--- STEP 2: Parsing PDF for GitHub Repository URL... ---")
         
         if args.github:
             github_url = args.github
-            print(f"[INFO] Using provided GitHub URL: {github_url}")
+            log(f"[INFO] Using provided GitHub URL: {github_url}")
+        elif prefix_links:
+            github_url = prefix_links[0]
         else:
             # Create parser with the PDF path
+            log.flush()
             paper_parser = PaperParser(pdf_path)
-            github_links = paper_parser.extract_github_link()
+            # Only the first link is used, so stop reading pages once it is found
+            github_links = paper_parser.extract_github_link(max_links=1)
             
             if not github_links:
                 raise RuntimeError("Could not find GitHub URL in the PDF")
@@ -134,67 +194,102 @@ def main():
             # Use the first found link
             github_url = github_links[0]
         
-        print(f"[SUCCESS] Found GitHub URL: {github_url}\n")
+        log(f"[SUCCESS] Found GitHub URL: {github_url}\n")
         
         # ============================================================
         # STEP 3: Clone the repository
         # ============================================================
-        print("--- STEP 3: Cloning GitHub Repository... ---")
+        log("--- STEP 3: Cloning GitHub Repository... ---")
         
-        if not clone_repository(github_url, repo_dir):
+        log.flush()
+        prepared_python = None
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            # The venv does not depend on the repository, so build it while cloning.
+            # A venv left by a completed earlier install is kept until Step 5 can
+            # check whether the cloned repository still matches it. When Step 4
+            # may still choose the current environment the venv is left to Step 5,
+            # so it is not built for nothing.
+            clone_future = executor.submit(clone_repository, github_url, repo_dir)
+            if not allow_current_env and not venv_has_install_key(venv_dir):
+                try:
+                    prepared_python = prepare_virtual_environment(
+                        venv_dir, args.python, reuse_host_packages=args.reuse_host_packages
+                    )
+                except Exception as e:
+                    log(f"[WARNING] Early virtual environment setup failed, will retry in Step 5: {e}")
+            cloned = clone_future.result()
+        
+        if not cloned:
             raise RuntimeError(f"Failed to clone repository: {github_url}")
         
-        print(f"[SUCCESS] Repository successfully cloned into: {repo_dir}\n")
+        log(f"[SUCCESS] Repository successfully cloned into: {repo_dir}\n")
         
         # ============================================================
         # STEP 4: Analyze dependencies (informational)
         # ============================================================
-        print("--- STEP 4: Dependency Extraction using RequirementsExtractor... ---")
+        log("--- STEP 4: Dependency Extraction using RequirementsExtractor... ---")
+        
+        reuse_current_env = False
         
         try:
+            log.flush()
             extractor = RequirementsExtractor(repo_dir=repo_dir, output_dir=work_dir_abs)
             deps = extractor.extract()
             
             if deps:
                 if deps[0] == "__USE_PYPROJECT__":
-                    print("[INFO] pyproject.toml detected - installation will be handled via pip install .")
+                    log("[INFO] pyproject.toml detected - installation will be handled via pip install .")
                 elif deps[0] == "__USE_SETUPTOOLS__":
-                    print("[INFO] setup.py/setup.cfg detected - installation will be handled via pip install .")
+                    log("[INFO] setup.py/setup.cfg detected - installation will be handled via pip install .")
                 else:
-                    print(f"[INFO] Found {len(deps)} dependencies.")
+                    log(f"[INFO] Found {len(deps)} dependencies.")
+                    # A pyproject repo still needs its own package installed into a venv
+                    has_pyproject = os.path.exists(os.path.join(repo_dir, "pyproject.toml"))
+                    if allow_current_env and not has_pyproject:
+                        reuse_current_env = requirements_satisfied(extractor.output_file)
         except Exception as e:
-            print(f"[WARNING] Dependency analysis failed: {e}")
+            log(f"[WARNING] Dependency analysis failed: {e}")
             # Check for pyproject.toml manually
             pyproject_path = os.path.join(repo_dir, "pyproject.toml")
             if os.path.exists(pyproject_path):
-                print("[INFO] pyproject.toml detected - installation will be handled via pip install .")
+                log("[INFO] pyproject.toml detected - installation will be handled via pip install .")
         
-        print()
+        log()
         
         # ============================================================
         # STEP 5: Create virtual environment and install dependencies
         # ============================================================
-        print(f"--- STEP 5: Setting up Virtual Environment in {venv_dir}... ---")
-        
-        success, venv_python = setup_venv_and_install(
-            venv_path=venv_dir,
-            repo_path=repo_dir,
-            python_executable=args.python,
-            preinstall_deps=["numpy", "scipy"]
-        )
-        
-        if not success:
-            raise RuntimeError("Failed to setup virtual environment and install dependencies")
+        if reuse_current_env:
+            venv_dir = sys.prefix
+            venv_python = sys.executable
+            log(f"--- STEP 5: Setting up Virtual Environment in {venv_dir}... ---")
+            log("[INFO] All requirements already satisfied; reusing current environment.")
+        else:
+            log(f"--- STEP 5: Setting up Virtual Environment in {venv_dir}... ---")
+            
+            log.flush()
+            success, venv_python = setup_venv_and_install(
+                venv_path=venv_dir,
+                repo_path=repo_dir,
+                python_executable=args.python,
+                preinstall_deps=["numpy", "scipy"],
+                venv_python=prepared_python,
+                reuse_host_packages=args.reuse_host_packages
+            )
+            
+            if not success:
+                raise RuntimeError("Failed to setup virtual environment and install dependencies")
         
-        print(f"\n[SUCCESS] Virtual environment ready with Python at: {venv_python}\n")
+        log(f"\n[SUCCESS] Virtual environment ready with Python at: {venv_python}\n")
         
         # ============================================================
         # STEP 6: Generate demo (unless skipped)
         # ============================================================
         demo_generated = False
+        creator = None
         
         if not args.skip_demo:
-            print("--- STEP 6: Generating Demo Script... ---")
+            log("--- STEP 6: Generating Demo Script... ---")
             
             try:
                 installed_packages = get_installed_packages(venv_python)
@@ -206,66 +301,74 @@ def main():
                 )
                 
                 # Generate the demo
+                log.flush()
                 result_path = creator.generate_demo()
                 
                 if result_path and Path(result_path).exists():
                     demo_generated = True
                     demo_path = str(result_path)
-                    print(f"[SUCCESS] Demo script generated at: {demo_path}\n")
+                    log(f"[SUCCESS] Demo script generated at: {demo_path}\n")
                 else:
-                    print("[WARNING] Demo generation failed or was skipped.\n")
+                    log("[WARNING] Demo generation failed or was skipped.\n")
                     
             except Exception as e:
-                print(f"[WARNING] Demo generation failed: {e}\n")
+                log(f"[WARNING] Demo generation failed: {e}\n")
+                log.flush()
                 import traceback
                 traceback.print_exc()
         else:
-            print("--- STEP 6: Skipping Demo Generation (--skip-demo) ---\n")
+            log("--- STEP 6: Skipping Demo Generation (--skip-demo) ---\n")
         
         # ============================================================
         # STEP 7: Auto-run demo if requested
         # ============================================================
         if args.auto_run and demo_generated and os.path.exists(demo_path):
-            print("--- STEP 7: Auto-Running Generated Demo... ---")
-            run_demo(venv_python, demo_path, repo_dir)
+            log("--- STEP 7: Auto-Running Generated Demo... ---")
+            log.flush()
+            if not run_demo(venv_python, demo_path, repo_dir) and creator is not None:
+                # Don't replay a demo that is known not to work on the next run
+                creator.forget_cached_demo()
         elif args.auto_run:
-            print("--- STEP 7: Skipping Auto-Run (no demo available) ---\n")
+            log("--- STEP 7: Skipping Auto-Run (no demo available) ---\n")
         
         # ============================================================
         # Success summary
         # ============================================================
-        print("\n" + "=" * 60)
-        print("PIPELINE COMPLETED SUCCESSFULLY")
-        print("=" * 60)
-        print(f"  Repository: {repo_dir}")
-        print(f"  Virtual Environment: {venv_dir}")
-        print(f"  Venv Python: {venv_python}")
+        log("\n" + "=" * 60)
+        log("PIPELINE COMPLETED SUCCESSFULLY")
+        log("=" * 60)
+        log(f"  Repository: {repo_dir}")
+        log(f"  Virtual Environment: {venv_dir}")
+        log(f"  Venv Python: {venv_python}")
         if demo_generated:
-            print(f"  Demo Script: {demo_path}")
-        print()
-        print("To activate the environment:")
+            log(f"  Demo Script: {demo_path}")
+        log()
+        log("To activate the environment:")
         if os.name == 'nt':
-            print(f"  {venv_dir}\\Scripts\\activate")
+            log(f"  {venv_dir}\\Scripts\\activate")
         else:
-            print(f"  source {venv_dir}/bin/activate")
-        print("=" * 60)
+            log(f"  source {venv_dir}/bin/activate")
+        log("=" * 60)
         
         return 0
         
     except FileNotFoundError as e:
-        print(f"\n[ERROR] File not found: {e}")
+        log(f"\n[ERROR] File not found: {e}")
         return 1
     except RuntimeError as e:
-        print(f"\n[ERROR] Pipeline failed: {e}")
+        log(f"\n[ERROR] Pipeline failed: {e}")
         return 1
     except KeyboardInterrupt:
-        print("\n[INFO] Pipeline interrupted by user.")
+        log("\n[INFO] Pipeline interrupted by user.")
         return 130
     except Exception as e:
-        print(f"\n[ERROR] Unexpected error: {e}")
+        log(f"\n[ERROR] Unexpected error: {e}")
+        log.flush()
         import traceback
         traceback.print_exc()
         return 1
+    finally:
+        log.flush()
 
 
 if __name__ == "__main__":
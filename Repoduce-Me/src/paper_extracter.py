@@ -1,29 +1,101 @@
+import multiprocessing
 import re
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterator, List, Optional, Tuple
 import json
 
-from PyPDF2 import PdfReader
-from constructor_model import ConstructorModel
+from utils import llm_cache_key, read_llm_cache, write_llm_cache
+
+# pypdfium2 extracts page text in native code and is much faster than PyPDF2's
+# pure-Python content-stream interpreter; PyPDF2 stays as the fallback.
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+    from PyPDF2 import PdfReader
+
+
+_GITHUB_RE = re.compile(r"https?://github\.com/[^\s)\"'>]+")
+_GITHUB_BYTES_RE = re.compile(rb"https?://github\.com/[^\s)\"'>\\]+")
+_TRAILING_PUNCTUATION = '.,);:\'"'
+# Path segments that lead away from the repository root
+_ROOT_STOPS = ('/tree/', '/blob/', '/issues/', '/pull/', '/wiki/', '/releases/', '/commit/')
+# A line ending in '/' or '-' is a URL wrapped by the PDF layout; rejoin it.
+_WRAPPED_LINE_RE = re.compile(r"([/-])[ \t\r]*\n[ \t]*")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _clean_github_link(url: str) -> str:
+    """Strip trailing punctuation and reduce a GitHub URL to its repository root."""
+    clean = url.rstrip(_TRAILING_PUNCTUATION)
+    # Sanitize: cut at the first /tree/, /blob/, /issues/, etc. to get root repo
+    cut = len(clean)
+    for stop in _ROOT_STOPS:
+        idx = clean.find(stop, 0, cut)
+        if idx != -1:
+            cut = idx
+    return clean[:cut]
+
+
+def _find_github_links(text: str) -> Iterator[str]:
+    """Yield the cleaned GitHub links in `text`, repairing URLs wrapped across lines."""
+    # Repair URLs broken across lines, then flatten to a single line
+    continuous_text = _WHITESPACE_RE.sub(" ", _WRAPPED_LINE_RE.sub(r"\1", text))
+    for m in _GITHUB_RE.finditer(continuous_text):
+        yield _clean_github_link(m.group(0))
+
+
+def _extract_one(paper_filepath: str) -> Tuple[str, List[str]]:
+    """Pool worker for PaperParser.extract_many; must be module-level to pickle."""
+    try:
+        return paper_filepath, PaperParser(paper_filepath).extract_github_link()
+    except Exception as e:
+        print(f"[WARNING] Could not extract GitHub links from {paper_filepath}: {e}")
+        return paper_filepath, []
 
 
 class PaperParser:
     """A parser to extract GitHub links from the pdf provided"""
 
+    LLM_MODEL = "gpt-5.1"
+
     def __init__(self, paper_filepath: str = ""):
         self.paper_filepath = paper_filepath
-        self.llm = ConstructorModel(model="gpt-5.1")
+        self._llm = None
 
+    @property
+    def llm(self):
+        """
+        Lazy initialization of the LLM.
 
-    def _extract_paper_title(self, reader: PdfReader) -> str:
-        """Return the first non-empty line of the first page."""
-        if not reader.pages:
-            return ""
+        It is only needed when the PDF contains no link, so the LLM client
+        stack is neither imported nor set up on the common path.
+        """
+        if self._llm is None:
+            from constructor_model import get_model
+            self._llm = get_model(self.LLM_MODEL)
+        return self._llm
+
+
+    @staticmethod
+    def _iter_page_texts(pdf_path: Path) -> Iterator[str]:
+        """Yield the text of each page in order, extracting lazily."""
+        if pdfium is not None:
+            pdf = pdfium.PdfDocument(str(pdf_path))
+            try:
+                for page in pdf:
+                    yield page.get_textpage().get_text_range()
+            finally:
+                pdf.close()
+            return
 
-        first_page = reader.pages[0]
-        text = first_page.extract_text() or ""
+        reader = PdfReader(pdf_path)
+        for page in reader.pages:
+            yield page.extract_text() or ""
 
-        for line in text.splitlines():
+    def _extract_paper_title(self, first_page_text: str) -> str:
+        """Return the first non-empty line of the first page."""
+        for line in first_page_text.splitlines():
             line = line.strip()
             if line:
                 return line
@@ -35,6 +107,10 @@ class PaperParser:
         """
         Query LLM to search for GitHub repo based on paper title.
         Returns raw LLM response (should be JSON-like).
+
+        Answers that parse as JSON are cached on disk under LLM_CACHE_DIR,
+        keyed by model and prompt, so re-running on the same paper skips the call.
+        Entries expire after LLM_CACHE_TTL and are bypassed by --no-llm-cache.
         """
         prompt = (
             "You are a very good researcher. "
@@ -43,12 +119,43 @@ class PaperParser:
             "{ github_link: [actual_github_link] }"
         )
 
+        key = llm_cache_key(self.LLM_MODEL, prompt)
+        cached = read_llm_cache(key)
+        if cached is not None:
+            return cached
+
         response = self.llm.invoke(prompt)
-        return getattr(response, "content", str(response))
+        content = getattr(response, "content", str(response))
 
-    def extract_github_link(self, paper_filepath: str = "") -> List[str]:
+        try:
+            json.loads(content)
+        except (json.JSONDecodeError, TypeError):
+            return content
+
+        write_llm_cache(key, content)
+        return content
+
+    @staticmethod
+    def extract_github_link_from_bytes(data: bytes) -> List[str]:
+        """
+        Scan raw (possibly truncated) PDF bytes for GitHub links.
+
+        Link annotations store their target as a plain `/URI (...)` string, so a
+        prefix of the file is often enough to find the repository without
+        downloading or parsing the whole PDF. Returns an empty list on no match.
+        """
+        # dict.fromkeys deduplicates while preserving first-seen order
+        return list(dict.fromkeys(
+            _clean_github_link(m.group(0).decode("ascii", errors="ignore"))
+            for m in _GITHUB_BYTES_RE.finditer(data)
+        ))
+
+    def extract_github_link(self, paper_filepath: str = "", max_links: Optional[int] = None) -> List[str]:
         """
         Return a list of GitHub links. If no links are found the list is empty.
+
+        Pages are extracted one at a time; once `max_links` distinct links have
+        been found the remaining pages are not read.
         
         IMPORTANT: Always returns a List[str], never a single string.
         """
@@ -60,52 +167,48 @@ class PaperParser:
         if not pdf_path.exists():
             raise FileNotFoundError(f"File not found: {pdf_path}")
 
-        reader = PdfReader(pdf_path)
-
-        github_links: List[str] = []
-        
-        # Combine all lines from all pages
-        all_lines = []
-        for page in reader.pages:
-            all_lines.extend((page.extract_text() or "").splitlines())
-
-        # Repair broken URLs across lines
-        repaired_lines = []
-        i = 0
-        while i < len(all_lines):
-            current_line = all_lines[i].strip()
-            
-            if (current_line.endswith('/') or current_line.endswith('-')) and i + 1 < len(all_lines):
-                next_line = all_lines[i+1].strip()
-                joined_line = current_line + next_line
-                repaired_lines.append(joined_line)
-                i += 2  
+        # Extract GitHub URLs, deduplicating while preserving order
+        # (dict keys act as an insertion-ordered set)
+        seen = {}
+        first_page_text = ""
+        # Last line of the previous page when it may be a URL wrapped onto this one
+        carry = ""
+        pages = self._iter_page_texts(pdf_path)
+        try:
+            for page_number, text in enumerate(pages):
+                if page_number == 0:
+                    first_page_text = text
+
+                text = carry + text
+                carry = ""
+                # Hold back a trailing wrapped line so it is repaired together
+                # with the top of the next page, as if the pages were one text.
+                head, _, last_line = text.rstrip().rpartition("\n")
+                if last_line.rstrip().endswith(("/", "-")):
+                    text, carry = head, last_line + "\n"
+
+                # Rejoining only ever follows a '/' or '-', so it can't create
+                # "github.com"; text without the substring needs no repair.
+                # Checked after the carry-over, so a page that only continues
+                # a URL from the previous page is still scanned.
+                if "github.com" not in text:
+                    continue
+
+                for link in _find_github_links(text):
+                    seen.setdefault(link, None)
+
+                if max_links is not None and len(seen) >= max_links:
+                    break
             else:
-                repaired_lines.append(current_line)
-                i += 1
+                for link in _find_github_links(carry):
+                    seen.setdefault(link, None)
+        finally:
+            pages.close()
 
-        continuous_text = " ".join(repaired_lines)
-        
-        # Extract GitHub URLs
-        pattern = re.compile(r"https?://github\.com/[^\s)\"'>]+")
-        matches = pattern.findall(continuous_text)
-
-        for m in matches:
-            clean = m.rstrip('.,);:\'"')
-            # Sanitize: remove /tree/, /blob/, /issues/, etc. to get root repo
-            clean = re.sub(r'/(tree|blob|issues|pull|wiki|releases|commit)/.*$', '', clean)
-            github_links.append(clean)
-        
-        # Deduplicate while preserving order
-        seen = set()
-        unique_links: List[str] = []
-        for link in github_links:
-            if link not in seen:
-                seen.add(link)
-                unique_links.append(link)
+        unique_links: List[str] = list(seen)[:max_links]
 
         if not unique_links:
-            paper_title = self._extract_paper_title(reader)
+            paper_title = self._extract_paper_title(first_page_text)
             if paper_title:
                 try:
                     llm_response = self._search_web(paper_title)
@@ -123,4 +226,19 @@ class PaperParser:
                 except (json.JSONDecodeError, KeyError, TypeError) as e:
                     print(f"[WARNING] Could not parse LLM response for GitHub link: {e}")
 
-        return unique_links
\ No newline at end of file
+        return unique_links
+
+    @classmethod
+    def extract_many(cls, paper_filepaths: List[str], workers: Optional[int] = None) -> Dict[str, List[str]]:
+        """
+        Extract GitHub links from several PDFs in parallel.
+
+        Text extraction is CPU-bound and holds the GIL, so each PDF is handled
+        in its own worker process. Returns {paper_filepath: links}; a PDF that
+        fails to parse maps to an empty list.
+        """
+        if len(paper_filepaths) <= 1 or workers == 1:
+            return dict(_extract_one(path) for path in paper_filepaths)
+
+        with multiprocessing.Pool(workers) as pool:
+            return dict(pool.imap_unordered(_extract_one, paper_filepaths))
@@ -1,7 +1,207 @@
+import ast
+import hashlib
+import json
+import logging
+import mmap
 import os
 import re
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Set
+from types import MappingProxyType
+from typing import FrozenSet, Iterator, List, Mapping, Optional, Set
+
+from constants import SCAN_CACHE_DIR
+from utils import load_pyproject
+
+
+# Per-file scan diagnostics run on worker threads and can be numerous, so they
+# go through logging (thread-safe, formatted lazily); pipeline status stays on stdout.
+logger = logging.getLogger(__name__)
+
+# Modules that shipped with older Pythons but have since been removed. Old
+# repositories still import them, and they must never become pip requirements.
+_REMOVED_STDLIB: FrozenSet[str] = frozenset({
+    '__main__', '_dummy_thread', 'dummy_threading', 'formatter', 'macpath',
+    'parser', 'symbol', 'binhex', 'asynchat', 'asyncore', 'distutils', 'imp',
+    'smtpd', 'aifc', 'audioop', 'cgi', 'cgitb', 'chunk', 'crypt', 'imghdr',
+    'lib2to3', 'mailcap', 'msilib', 'nis', 'nntplib', 'ossaudiodev', 'pipes',
+    'sndhdr', 'spwd', 'sunau', 'telnetlib', 'uu', 'xdrlib',
+})
+
+_STDLIB: FrozenSet[str] = frozenset(sys.stdlib_module_names) | _REMOVED_STDLIB
+
+# Import names whose pip distribution is named differently. Read-only, so the
+# scan threads can share it safely.
+_MODULE_TO_PACKAGE: Mapping[str, str] = MappingProxyType({
+    'skimage': 'scikit-image',
+    'sklearn': 'scikit-learn',
+    'mpl_toolkits': 'matplotlib',
+    'cv2': 'opencv-python',
+    'PIL': 'Pillow',
+    'yaml': 'PyYAML',
+    'tqdm': 'tqdm',
+    'h5py': 'h5py',
+    'jax': 'jax',
+    'tf': 'tensorflow',
+    'torch': 'torch',
+    'timm': 'timm',
+    'matplotlib_inline': 'matplotlib-inline',
+    'healpy': 'healpy',
+    'torchvision': 'torchvision',
+    'torchaudio': 'torchaudio',
+    'omegaconf': 'omegaconf',
+    'einops': 'einops',
+    'wandb': 'wandb',
+    'astropy': 'astropy',
+})
+
+# Matches both import forms at the start of any line, so a whole file can be
+# scanned in one pass. Relative imports never match (the name cannot start with '.').
+# Module names are ASCII, so the raw file bytes are scanned without decoding.
+_IMPORT_SCAN_RE = re.compile(
+    rb"^[ \t]*(?:import[ \t]+([A-Za-z0-9_]+)"
+    rb"|from[ \t]+([A-Za-z0-9_]+)(?:\.[A-Za-z0-9_.]+)?[ \t]+import)",
+    re.MULTILINE,
+)
+# Small repos are scanned on a thread pool, which overlaps the file reads.
+# Regex matching holds the GIL, so large repos go to a process pool instead,
+# where it scales with cores and outweighs the pool's startup cost.
+_SCAN_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+_PROCESS_POOL_MIN_FILES = 500
+_MMAP_MIN_BYTES = 256 * 1024
+
+# First top-level def/class/decorator: by convention the import block ends here.
+_BODY_START_RE = re.compile(rb"^(?:def[ \t]|class[ \t]|async[ \t]+def[ \t]|@)", re.MULTILINE)
+
+# Leading distribution name of a requirement line, before any extras/specifier
+_PKG_NAME_RE = re.compile(r"[A-Za-z0-9_.-]+", re.ASCII)
+
+
+def _header_import_names(header: bytes) -> Optional[Set[str]]:
+    """
+    Top-level names of all absolute imports in a file header, via the AST.
+    Returns None when the header does not parse, so the caller can fall back
+    to the regex scan.
+    """
+    try:
+        tree = ast.parse(header)
+    except (SyntaxError, ValueError):
+        return None
+
+    names: Set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split(".", 1)[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            names.add(node.module.split(".", 1)[0])
+    return names
+
+
+def _scan_content(
+    content: bytes | mmap.mmap,
+    skip: FrozenSet[str],
+    module_to_package: Mapping[str, str],
+    header_only: bool = False,
+) -> Set[str]:
+    """
+    Return the external packages imported by a file's raw contents. With
+    header_only, scanning stops at the first top-level def/class/decorator.
+    """
+    found: Set[str] = set()
+
+    # Cheap substring filter: files that never say "import" can't match.
+    if content.find(b"import") == -1:
+        return found
+
+    # Bind hot-loop lookups to locals once per file
+    add = found.add
+    to_package = module_to_package.get
+
+    # Files re-import the same few packages many times; classify each raw
+    # name once and skip repeats before decoding.
+    seen: Set[bytes] = set()
+    mark_seen = seen.add
+
+    endpos = len(content)
+    if header_only:
+        body_start = _BODY_START_RE.search(content)
+        if body_start:
+            endpos = body_start.start()
+
+        # The header ends at a statement boundary, so it usually parses on its
+        # own; the AST is exact for comma lists and parenthesised imports.
+        header_names = _header_import_names(content[:endpos])
+        if header_names is not None:
+            for module_name in header_names:
+                if module_name not in skip:
+                    add(to_package(module_name, module_name))
+            return found
+
+    for match in _IMPORT_SCAN_RE.finditer(content, 0, endpos):
+        raw_name = match.group(1) or match.group(2)
+        if raw_name in seen:
+            continue
+        mark_seen(raw_name)
+
+        module_name = raw_name.decode("ascii")
+        if module_name in skip:
+            continue
+
+        add(to_package(module_name, module_name))
+
+    return found
+
+
+def _scan_file(
+    file_path: str | Path,
+    skip: FrozenSet[str],
+    module_to_package: Mapping[str, str],
+    header_only: bool = False,
+) -> Set[str]:
+    """
+    Read a Python file and return the external packages it imports. Names in
+    `skip` (stdlib and repo-local modules) are ignored.
+    """
+    file_name = os.path.basename(file_path)
+    if not file_name.endswith(".py") or file_name.startswith("."):
+        return set()
+
+    try:
+        with open(file_path, "rb") as f:
+            # Large (often generated) files are mapped rather than copied into memory
+            if os.fstat(f.fileno()).st_size >= _MMAP_MIN_BYTES:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return _scan_content(mapped, skip, module_to_package, header_only)
+            content = f.read()
+    except Exception as e:
+        logger.warning("Skipping file due to read error: %s (%s)", file_path, e)
+        return set()
+
+    try:
+        return _scan_content(content, skip, module_to_package, header_only)
+    except Exception as e:
+        logger.warning("Could not analyze imports in file %s: %s. Skipping file.", file_path, e)
+        return set()
+
+
+# Process-pool workers receive the lookup tables once, via the initializer,
+# instead of pickling them with every file.
+_worker_skip: FrozenSet[str] = frozenset()
+_worker_module_to_package: Mapping[str, str] = _MODULE_TO_PACKAGE
+_worker_header_only: bool = False
+
+
+def _init_scan_worker(skip: FrozenSet[str], module_to_package: Mapping[str, str], header_only: bool) -> None:
+    global _worker_skip, _worker_module_to_package, _worker_header_only
+    _worker_skip = skip
+    _worker_module_to_package = module_to_package
+    _worker_header_only = header_only
+
+
+def _scan_file_in_worker(file_path: str) -> Set[str]:
+    return _scan_file(file_path, _worker_skip, _worker_module_to_package, _worker_header_only)
 
 
 class RequirementsExtractor:
@@ -9,7 +209,8 @@ class RequirementsExtractor:
     Scans a cloned repository directory to identify external Python package dependencies.
 
     Priority:
-        1) If pyproject.toml exists      -> caller should run `pip install .`
+        1) If pyproject.toml exists      -> its static [project].dependencies, or
+                                            caller should run `pip install .`
         2) If setup.py/setup.cfg exists  -> caller should run `pip install .`
         3) If requirements*.txt exists   -> use that directly
         4) Else                          -> dynamic import analysis to build requirements.txt
@@ -26,61 +227,9 @@ class RequirementsExtractor:
         - [<deps...>]             => install via `pip install -r tmp/requirements.txt`
     """
 
-    STANDARD_LIBRARY: Set[str] = {
-        '__future__', '__main__', '_dummy_thread', '_thread', 'abc', 'aifc',
-        'antigravity', 'argparse', 'array', 'ast', 'asynchat', 'asyncio',
-        'asyncore', 'atexit', 'base64', 'bdb', 'binascii', 'binhex', 'bisect',
-        'builtins', 'bz2', 'calendar', 'cgi', 'cgitb', 'chunk', 'cmath', 'cmd',
-        'code', 'codecs', 'codeop', 'collections', 'colorsys', 'compileall',
-        'concurrent', 'configparser', 'contextlib', 'copy', 'copyreg', 'cProfile',
-        'csv', 'ctypes', 'datetime', 'dbm', 'decimal', 'difflib', 'dis',
-        'distutils', 'doctest', 'dummy_threading', 'email', 'encodings', 'errno',
-        'faulthandler', 'filecmp', 'fileinput', 'fnmatch', 'formatter', 'fractions',
-        'ftplib', 'functools', 'gc', 'getopt', 'getpass', 'gettext', 'glob', 'grp',
-        'gzip', 'hashlib', 'heapq', 'hmac', 'html', 'http', 'imaplib', 'imghdr',
-        'imp', 'importlib', 'inspect', 'io', 'ipaddress', 'itertools', 'json',
-        'keyword', 'lib2to3', 'linecache', 'locale', 'logging', 'lzma', 'mailbox',
-        'mailcap', 'marshal', 'math', 'mimetypes', 'mmap', 'modulefinder',
-        'multiprocessing', 'netrc', 'nis', 'nntplib', 'numbers', 'operator',
-        'optparse', 'os', 'ossaudiodev', 'pathlib', 'pdb', 'pickle', 'pickletools',
-        'pipes', 'pkgutil', 'platform', 'plistlib', 'poplib', 'posix', 'pprint',
-        'profile', 'pstats', 'pty', 'pwd', 'py_compile', 'pyclbr', 'pydoc',
-        'queue', 'quopri', 'random', 're', 'readline', 'reprlib', 'resource',
-        'rlcompleter', 'runpy', 'sched', 'secrets', 'select', 'selectors',
-        'shelve', 'shlex', 'shutil', 'signal', 'site', 'smtplib', 'sndhdr',
-        'socket', 'socketserver', 'spwd', 'sqlite3', 'sre_constants', 'sre_parse',
-        'ssl', 'stat', 'statistics', 'string', 'stringprep', 'struct', 'subprocess',
-        'sunau', 'symtable', 'sys', 'sysconfig', 'syslog', 'tabnanny', 'tarfile',
-        'telnetlib', 'tempfile', 'termios', 'textwrap', 'this', 'threading',
-        'time', 'timeit', 'tkinter', 'token', 'tokenize', 'trace', 'traceback',
-        'tracemalloc', 'tty', 'turtle', 'turtledemo', 'types', 'typing',
-        'unicodedata', 'unittest', 'urllib', 'uu', 'uuid', 'venv', 'warnings',
-        'wave', 'weakref', 'webbrowser', 'winreg', 'wsgiref', 'xdrlib', 'xml',
-        'xmlrpc', 'zipapp', 'zipfile', 'zipimport', 'zlib', 'zoneinfo'
-    }
-
-    MODULE_TO_PACKAGE: Dict[str, str] = {
-        'skimage': 'scikit-image',
-        'sklearn': 'scikit-learn',
-        'mpl_toolkits': 'matplotlib',
-        'cv2': 'opencv-python',
-        'PIL': 'Pillow',
-        'yaml': 'PyYAML',
-        'tqdm': 'tqdm',
-        'h5py': 'h5py',
-        'jax': 'jax',
-        'tf': 'tensorflow',
-        'torch': 'torch',
-        'timm': 'timm',
-        'matplotlib_inline': 'matplotlib-inline',
-        'healpy': 'healpy',
-        'torchvision': 'torchvision',
-        'torchaudio': 'torchaudio',
-        'omegaconf': 'omegaconf',
-        'einops': 'einops',
-        'wandb': 'wandb',
-        'astropy': 'astropy',
-    }
+    STANDARD_LIBRARY: FrozenSet[str] = _STDLIB
+
+    MODULE_TO_PACKAGE: Mapping[str, str] = _MODULE_TO_PACKAGE
 
     REQUIREMENTS_FILES: List[str] = [
         "requirements.txt",
@@ -89,7 +238,7 @@ class RequirementsExtractor:
         "requirements-base.txt",
     ]
 
-    IGNORE_DIRS: Set[str] = {
+    IGNORE_DIRS: FrozenSet[str] = frozenset({
         ".git",
         ".hg",
         ".svn",
@@ -100,101 +249,67 @@ class RequirementsExtractor:
         "build",
         "dist",
         "node_modules",
-    }
+        "site-packages",
+        "__pypackages__",
+        "htmlcov",
+    })
 
-    def __init__(self, repo_dir: str | Path, output_dir: str | Path):
+    def __init__(self, repo_dir: str | Path, output_dir: str | Path, strict: bool = True):
+        """
+        strict=False only scans each file up to its first top-level def/class,
+        where PEP 8 imports end. Much faster on large files, but misses imports
+        made later (e.g. lazy imports inside functions), so it is opt-in.
+        """
         self.repo_dir = Path(repo_dir)
+        self.strict = strict
         self.output_dir = Path(output_dir)
         self.output_file = self.output_dir / "requirements.txt"
         self.all_dependencies: Set[str] = set()
+        self._repo_top_level: Optional[Set[str]] = None
+        self._skip_modules: Optional[FrozenSet[str]] = None
 
-    def _extract_module_name(self, line: str) -> Optional[str]:
+    @staticmethod
+    def _importable_names(directory: str | Path) -> Set[str]:
+        """Names of the modules and regular packages directly inside directory."""
+        names: Set[str] = set()
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            return names
+
+        for entry in entries:
+            if entry.name.endswith(".py") and entry.is_file():
+                names.add(entry.name[:-3])
+            elif entry.is_dir() and os.path.isfile(os.path.join(entry.path, "__init__.py")):
+                names.add(entry.name)
+        return names
+
+    def _scan_repo_top_level(self) -> Set[str]:
         """
-        Extract base module name from a Python import line.
-
-        Handles:
-            - import foo
-            - import foo.bar as baz
-            - from foo.bar import x, y
+        Collect the names of top-level modules and packages in the repository
+        root, so local-import checks are set lookups instead of stat calls.
+        Packages under a src/ layout count as top-level too.
         """
-        line = line.strip()
-        if not line or line.startswith("#"):
-            return None
-
-        # 'import foo[.bar...]'
-        match_import = re.match(r"^\s*import\s+([a-zA-Z0-9_\.]+)", line)
-        if match_import:
-            module_path = match_import.group(1)
-            return module_path.split(".")[0]
-
-        # 'from foo[.bar...] import ...'
-        match_from = re.match(r"^\s*from\s+([a-zA-Z0-9_\.]+)\s+import", line)
-        if match_from:
-            module_path = match_from.group(1)
-            # Skip relative imports: from .foo import ...
-            if module_path.startswith("."):
-                return None
-            return module_path.split(".")[0]
-
-        return None
+        names = self._importable_names(self.repo_dir)
+        names |= self._importable_names(self.repo_dir / "src")
+        return names
 
-    def _is_local_import(self, module_name: str) -> bool:
+    def _get_skip_modules(self) -> FrozenSet[str]:
         """
-        Heuristic: check if module_name corresponds to a local module/package
-        inside the repository.
+        Stdlib and repo-local top-level names merged into one set, so the scan
+        decides "not a dependency" with a single hash lookup per import.
         """
-        if not module_name:
-            return False
-        if (self.repo_dir / f"{module_name}.py").exists():
-            return True
+        if self._skip_modules is None:
+            if self._repo_top_level is None:
+                self._repo_top_level = self._scan_repo_top_level()
+            self._skip_modules = self.STANDARD_LIBRARY | self._repo_top_level
+        return self._skip_modules
 
-        pkg_dir = self.repo_dir / module_name
-        if pkg_dir.is_dir():
-            if (pkg_dir / "__init__.py").exists():
-                return True
-
-        return False
-
-    def _process_file(self, file_path: Path) -> None:
+    def _process_file(self, file_path: str | Path) -> Set[str]:
         """
-        Reads a Python file, extracts imports, and adds external modules to the set.
+        Reads a Python file and returns the external packages it imports.
         """
-        if not file_path.suffix == ".py":
-            return
-
-        if file_path.name.startswith("."):
-            return
-
-        try:
-            content = file_path.read_text(encoding="utf-8")
-        except UnicodeDecodeError:
-            try:
-                content = file_path.read_text(encoding="latin-1")
-            except Exception as e:
-                print(f"[WARNING] Skipping file due to encoding/read error: {file_path} ({e})")
-                return
-        except Exception as e:
-            print(f"[WARNING] Skipping file due to read error: {file_path} ({e})")
-            return
-
-        try:
-            for line in content.splitlines():
-                module_name = self._extract_module_name(line)
-                if not module_name:
-                    continue
-
-                if module_name in self.STANDARD_LIBRARY:
-                    continue
-
-                if self._is_local_import(module_name):
-                    continue
-
-                package_name = self.MODULE_TO_PACKAGE.get(module_name, module_name)
-
-                self.all_dependencies.add(package_name)
-
-        except Exception as e:
-            print(f"[WARNING] Could not analyze imports in file {file_path}: {e}. Skipping file.")
+        return _scan_file(file_path, self._get_skip_modules(), self.MODULE_TO_PACKAGE, not self.strict)
 
     def _get_dependencies_from_file(self, file_path: Path) -> List[str]:
         """
@@ -205,24 +320,41 @@ class RequirementsExtractor:
         try:
             with file_path.open("r", encoding="utf-8") as f:
                 for line in f:
-                    line = line.strip()
-                    if not line or line.startswith("#"):
-                        continue
-
-                    line = re.sub(r"[ \t]*#.*$", "", line)  
-                    line = re.sub(r";.*$", "", line)         
-
-                    cleaned = line.strip()
+                    # Drop trailing comments and environment markers
+                    cleaned = line.partition("#")[0].partition(";")[0].strip()
                     if cleaned:
                         deps.append(cleaned)
         except Exception as e:
             print(f"[ERROR] Could not read dependency file {file_path}: {e}")
         return deps
 
+    def _get_dependencies_from_pyproject(self, pyproject: Path) -> List[str]:
+        """
+        Read the statically declared [project].dependencies from pyproject.toml.
+        Returns an empty list when they are dynamic, absent, or unreadable.
+        """
+        try:
+            data = load_pyproject(pyproject)
+            if data is None:
+                return []
+            project = data.get("project", {})
+        except Exception as e:
+            print(f"[WARNING] Could not parse {pyproject}: {e}")
+            return []
+
+        if "dependencies" in project.get("dynamic", []):
+            return []
+
+        deps = project.get("dependencies", [])
+        if not isinstance(deps, list):
+            return []
+        return [dep.strip() for dep in deps if isinstance(dep, str) and dep.strip()]
+
     def find_existing_requirements(self) -> Optional[List[str]]:
         """
         Priority:
-            1) pyproject.toml       -> ['__USE_PYPROJECT__']
+            1) pyproject.toml       -> [deps...] if declared statically,
+                                       else ['__USE_PYPROJECT__']
             2) setup.cfg/setup.py   -> ['__USE_SETUPTOOLS__']
             3) requirements*.txt    -> [deps...]
         """
@@ -230,6 +362,10 @@ class RequirementsExtractor:
 
         pyproject = repo_root / "pyproject.toml"
         if pyproject.exists():
+            static_deps = self._get_dependencies_from_pyproject(pyproject)
+            if static_deps:
+                print(f"[INFO] Found {len(static_deps)} static dependencies in pyproject.toml.")
+                return static_deps
             print("[INFO] Found pyproject.toml. Will install via `pip install .`.")
             return ["__USE_PYPROJECT__"]
 
@@ -247,11 +383,11 @@ class RequirementsExtractor:
             print(f"[INFO] Found existing dependency file: {filename}. Using contents.")
             deps = self._get_dependencies_from_file(file_path)
 
-            filtered = [
-                dep for dep in deps
-                if dep.split(">")[0].split("=")[0].split("<")[0].split("~")[0].strip()
-                not in self.STANDARD_LIBRARY
-            ]
+            filtered: List[str] = []
+            for dep in deps:
+                m = _PKG_NAME_RE.match(dep)
+                if (m.group(0) if m else "") not in self.STANDARD_LIBRARY:
+                    filtered.append(dep)
 
             if not filtered:
                 print(f"[WARNING] Dependency file {filename} contained no external packages after filtering.")
@@ -261,14 +397,128 @@ class RequirementsExtractor:
 
         return None
 
+    def _iter_python_files(self, root: str) -> Iterator[str]:
+        """
+        Yield the paths of all non-hidden .py files under root, skipping
+        IGNORE_DIRS and hidden directories. DirEntry caches the file type from
+        readdir, so no extra stat call is made per entry. Uses an explicit
+        stack, so deep trees cost neither recursion depth nor nested generators.
+        """
+        ignore_dirs = self.IGNORE_DIRS
+        stack = [root]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        name = entry.name
+                        if name.startswith("."):
+                            continue
+                        if entry.is_dir(follow_symlinks=False):
+                            if name not in ignore_dirs:
+                                stack.append(entry.path)
+                        elif name.endswith(".py"):
+                            yield entry.path
+            except OSError:
+                continue
+
+    def _scan_paths(self, paths: List[str], skip: FrozenSet[str]) -> List[Set[str]]:
+        """Scan files in parallel; returns one result set per path, in order."""
+        cpu_count = os.cpu_count() or 1
+        if cpu_count > 1 and len(paths) >= _PROCESS_POOL_MIN_FILES:
+            try:
+                with ProcessPoolExecutor(
+                    max_workers=cpu_count,
+                    initializer=_init_scan_worker,
+                    initargs=(skip, dict(self.MODULE_TO_PACKAGE), not self.strict),
+                ) as executor:
+                    chunksize = max(1, len(paths) // (4 * cpu_count))
+                    return list(executor.map(_scan_file_in_worker, paths, chunksize=chunksize))
+            except (OSError, RuntimeError) as e:
+                # e.g. no fork/semaphore support in a sandbox; fall back to threads
+                logger.warning("Process pool unavailable (%s); scanning with threads.", e)
+
+        with ThreadPoolExecutor(max_workers=_SCAN_WORKERS) as executor:
+            return list(executor.map(self._process_file, paths))
+
+    def _scan_fingerprint(self, skip: FrozenSet[str]) -> str:
+        """Identify the scan settings; cached results are only valid for the same ones."""
+        digest = hashlib.sha256()
+        digest.update("\n".join(sorted(skip)).encode("utf-8"))
+        digest.update(repr(sorted(self.MODULE_TO_PACKAGE.items())).encode("utf-8"))
+        digest.update(b"strict" if self.strict else b"header")
+        return digest.hexdigest()
+
+    def _clean_revision(self) -> Optional[str]:
+        """
+        The commit checked out in repo_dir, if repo_dir is the root of a git
+        work tree with no modified, untracked or ignored files; else None.
+
+        A fresh clone qualifies, so its content is fully identified by the commit.
+        """
+        try:
+            rev = subprocess.run(
+                ["git", "-C", str(self.repo_dir), "rev-parse", "--show-toplevel", "HEAD"],
+                capture_output=True, text=True, timeout=30
+            )
+            if rev.returncode != 0:
+                return None
+            toplevel, _, head = rev.stdout.strip().partition("\n")
+            # Not a repository of its own, just a directory inside another one
+            if os.path.realpath(toplevel) != os.path.realpath(self.repo_dir):
+                return None
+
+            status = subprocess.run(
+                ["git", "-C", str(self.repo_dir), "status", "--porcelain", "--ignored"],
+                capture_output=True, text=True, timeout=60
+            )
+        except (OSError, subprocess.SubprocessError):
+            return None
+        if status.returncode != 0 or status.stdout.strip():
+            return None
+        return head.strip() or None
+
+    def _scan_cache_file(self, fingerprint: str) -> Optional[Path]:
+        """Cache file for this scan, keyed by scan settings and repository content."""
+        revision = self._clean_revision()
+        if revision is None:
+            return None
+        key = hashlib.sha256(f"{fingerprint}\n{revision}".encode("utf-8")).hexdigest()
+        return SCAN_CACHE_DIR / f"{key}.json"
+
     def analyze_imports(self) -> None:
-        """Walk over the repo and collect imported external modules."""
-        for root, dirs, files in os.walk(self.repo_dir):
-            dirs[:] = [d for d in dirs if d not in self.IGNORE_DIRS and not d.startswith(".")]
+        """
+        Walk over the repo and collect imported external modules.
+
+        For a clean checkout the result is cached under SCAN_CACHE_DIR by
+        commit, so re-cloning the same revision (every pipeline run clones
+        afresh) skips the scan.
+        """
+        # Build the skip set up front so worker threads only read it.
+        skip = self._get_skip_modules()
+
+        cache_file = self._scan_cache_file(self._scan_fingerprint(skip))
+        if cache_file is not None:
+            try:
+                cached = json.loads(cache_file.read_bytes())
+            except (OSError, ValueError):
+                cached = None
+            if isinstance(cached, list):
+                self.all_dependencies.update(cached)
+                return
+
+        paths = list(self._iter_python_files(str(self.repo_dir)))
+        # Merge every file's result in one C-level union at the end
+        self.all_dependencies.update(*self._scan_paths(paths, skip))
 
-            for file_name in files:
-                file_path = Path(root) / file_name
-                self._process_file(file_path)
+        if cache_file is None:
+            return
+        try:
+            SCAN_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+            tmp_file.write_text(json.dumps(sorted(self.all_dependencies)), encoding="utf-8")
+            os.replace(tmp_file, cache_file)
+        except OSError as e:
+            logger.warning("Could not write scan cache %s: %s", cache_file, e)
 
     def extract(self) -> List[str]:
         """
@@ -302,9 +552,8 @@ class RequirementsExtractor:
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
         try:
-            with self.output_file.open("w", encoding="utf-8") as f:
-                for dep in dependencies:
-                    f.write(f"{dep}\n")
+            payload = "".join(f"{dep}\n" for dep in dependencies)
+            self.output_file.write_text(payload, encoding="utf-8")
 
             print(f"\n[SUCCESS] Extracted {len(dependencies)} external dependencies.")
             print(f"[SUCCESS] Requirements file written to: {self.output_file.resolve()}")
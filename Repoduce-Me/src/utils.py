@@ -1,14 +1,101 @@
+import glob
+import hashlib
+import json
+import re
 import subprocess
-from typing import Set
+import sys
+from typing import Any, List, Optional, Set, TextIO
 import os
 import shutil
+import time
+from functools import lru_cache
+from importlib import metadata
+from pathlib import Path
 
+from constants import LLM_CACHE_DIR, LLM_CACHE_TTL
+
+# tomllib is stdlib from Python 3.11; older interpreters need the tomli backport.
+try:
+    import tomllib
+except ImportError:
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+
+
+class StepLogger:
+    """
+    Collects the pipeline's progress lines and writes them once per step.
+
+    On an interactive terminal every line is printed immediately. Otherwise
+    (CI, batch runs piping to a log) lines are buffered and emitted with a
+    single write + flush whenever `flush()` is called at a step boundary.
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None) -> None:
+        self.stream = stream if stream is not None else sys.stdout
+        self.interactive = self.stream.isatty()
+        self._buffer: List[str] = []
+
+    def __call__(self, message: str = "") -> None:
+        if self.interactive:
+            print(message, file=self.stream)
+        else:
+            self._buffer.append(f"{message}\n")
+
+    def flush(self) -> None:
+        """Write out buffered lines; call before handing control to code that prints."""
+        if self._buffer:
+            self.stream.write("".join(self._buffer))
+            self._buffer.clear()
+        self.stream.flush()
+
+
+def _site_packages_dirs(venv_python: str) -> List[str]:
+    """
+    Locate the site-packages directories belonging to a venv's interpreter.
+    """
+    # Do not resolve symlinks: venv/bin/python usually points at the base interpreter.
+    env_root = Path(venv_python).absolute().parent.parent
+
+    try:
+        pyvenv_cfg = (env_root / "pyvenv.cfg").read_text(encoding="utf-8")
+    except OSError:
+        pyvenv_cfg = ""
+    if re.search(r"^include-system-site-packages\s*=\s*true\s*$", pyvenv_cfg, re.MULTILINE | re.IGNORECASE):
+        # The base interpreter's packages are visible too; let `pip list` report them.
+        return []
+
+    if os.name == 'nt':
+        candidates = [env_root / "Lib" / "site-packages"]
+    else:
+        candidates = sorted(env_root.glob("lib*/python*/site-packages"))
+
+    return [str(p) for p in candidates if p.is_dir()]
 
 
 def get_installed_packages(venv_python: str) -> Set[str]:
     """
     Get a set of installed package names from the virtual environment.
+
+    Reads distribution metadata from the venv's site-packages in-process,
+    falling back to `pip list` in a subprocess if it cannot be located.
     """
+    site_dirs = _site_packages_dirs(venv_python)
+    if site_dirs:
+        try:
+            packages = {
+                dist.metadata["Name"].lower()
+                for dist in metadata.distributions(path=site_dirs)
+                if dist.metadata["Name"]
+            }
+            if packages:
+                return packages
+        except Exception:
+            pass
+
     try:
         result = subprocess.run(
             [venv_python, "-m", "pip", "list", "--format=freeze"],
@@ -34,19 +121,210 @@ def get_installed_packages(venv_python: str) -> Set[str]:
         return set()
 
 
+def load_pyproject(path) -> Optional[dict]:
+    """
+    Parse a pyproject.toml, reusing the result while the file is unchanged.
+
+    Dependency analysis and the install fallbacks both read the repository's
+    pyproject.toml during one run; the parse is cached on the file's mtime and
+    size so only the first reader pays for it. Callers must not mutate the
+    returned dict.
+
+    Returns None if no TOML parser is available. Read and parse errors are
+    raised to the caller.
+    """
+    if tomllib is None:
+        return None
+    st = os.stat(path)
+    return _parse_pyproject(os.fspath(path), st.st_mtime_ns, st.st_size)
+
+
+@lru_cache(maxsize=8)
+def _parse_pyproject(path: str, mtime_ns: int, size: int) -> dict:
+    with open(path, "rb") as f:
+        return tomllib.load(f)
+
+
+def llm_cache_key(model: str, prompt: Any) -> str:
+    """
+    Return the LLM_CACHE_DIR key for a prompt sent to `model`.
+
+    `prompt` is a string or a list of (role, content) messages; answers are
+    assumed deterministic for a given model and prompt.
+    """
+    text = prompt if isinstance(prompt, str) else json.dumps(prompt, ensure_ascii=False)
+    return hashlib.sha256(f"{model}\n{text}".encode("utf-8")).hexdigest()
+
+
+def read_llm_cache(key: str, max_age: float = LLM_CACHE_TTL) -> Optional[str]:
+    """
+    Return the cached LLM answer for `key`, or None on a miss.
+
+    Answers older than `max_age` seconds count as a miss, so a wrong answer is
+    eventually replaced. Setting REPRODUCE_NO_LLM_CACHE (main.py's
+    --no-llm-cache) makes every lookup miss; fresh answers are still written.
+    """
+    if os.environ.get("REPRODUCE_NO_LLM_CACHE"):
+        return None
+
+    cache_file = LLM_CACHE_DIR / f"{key}.json"
+    try:
+        if time.time() - cache_file.stat().st_mtime > max_age:
+            return None
+        return cache_file.read_text(encoding="utf-8")
+    except OSError:
+        return None
+
+
+def write_llm_cache(key: str, content: str) -> None:
+    """
+    Store an LLM answer under `key`.
+
+    The file is written beside its final name and renamed into place, so a
+    concurrent reader never sees a partial answer. Failures only warn.
+    """
+    cache_file = LLM_CACHE_DIR / f"{key}.json"
+    try:
+        LLM_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        tmp_file.write_text(content, encoding="utf-8")
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        print(f"[WARNING] Could not cache LLM response: {e}")
+
+
+def drop_llm_cache(key: str) -> None:
+    """Forget the cached LLM answer for `key`, if any."""
+    try:
+        (LLM_CACHE_DIR / f"{key}.json").unlink()
+    except OSError:
+        pass
+
+
+def fast_rmtree(path) -> None:
+    """
+    Delete a directory tree with the platform's native tool and wait for it.
+
+    `rm -rf` (or `rd /s /q` on Windows) removes large trees such as a venv's
+    site-packages much faster than shutil.rmtree, which pays for a Python-level
+    call per entry. Falls back to shutil.rmtree if the tool is unavailable.
+
+    Raises:
+        subprocess.CalledProcessError: If the native tool fails.
+    """
+    path = os.fspath(path)
+
+    if os.name == 'nt':
+        command = ["cmd", "/c", "rd", "/s", "/q", path]
+    else:
+        command = ["rm", "-rf", "--", path]
+
+    try:
+        subprocess.run(
+            command,
+            check=True,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+    except FileNotFoundError:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def _pid_alive(pid: int) -> bool:
+    """Whether a process with this pid exists (always True where it can't be checked)."""
+    if os.name == 'nt':
+        # os.kill would terminate the process on Windows
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass
+    return True
+
+
+def _stale_trash(path: str) -> List[str]:
+    """
+    Trash siblings of `path` left by processes that are no longer running.
+
+    Trash of a live process is still being deleted by the `rm` it started.
+    """
+    stale = []
+    for trash in glob.glob(f"{glob.escape(path)}.trash.*"):
+        pid = trash[len(path):].split(".")[2]
+        if pid.isdigit() and not _pid_alive(int(pid)):
+            stale.append(trash)
+    return stale
+
+
+def discard_directory(path) -> bool:
+    """
+    Remove a directory without waiting for the deletion to finish.
+
+    The directory is first renamed to a sibling trash path, which is atomic and
+    frees the original path immediately. A detached `rm -rf` (or `rd /s /q` on
+    Windows) then deletes the trash after this call returns. Falls back to a
+    blocking delete if the rename or the spawn fails.
+
+    Trash siblings left by earlier runs that were killed before their delete
+    finished are swept up by the same delete.
+
+    Returns False if there was nothing to remove.
+    """
+    path = os.fspath(path).rstrip("/\\")
+
+    trash = f"{path}.trash.{os.getpid()}.{time.time_ns()}"
+    try:
+        os.rename(path, trash)
+    except FileNotFoundError:
+        return False
+    except OSError:
+        try:
+            fast_rmtree(path)
+        except subprocess.CalledProcessError:
+            shutil.rmtree(path, ignore_errors=True)
+        return True
+
+    trash_dirs = [trash, *_stale_trash(path)]
+
+    if os.name == 'nt':
+        command = ["cmd", "/c", "rd", "/s", "/q", *trash_dirs]
+        options = {"creationflags": subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP}
+    else:
+        command = ["rm", "-rf", "--", *trash_dirs]
+        options = {"start_new_session": True}
+
+    try:
+        subprocess.Popen(
+            command,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            **options
+        )
+    except OSError:
+        shutil.rmtree(trash, ignore_errors=True)
+
+    return True
+
+
 def clone_repository(github_url: str, target_dir: str) -> bool:
     """
     Clone a GitHub repository to the target directory.
     """
     print(f"Attempting to clone '{github_url}' into '{target_dir}'...")
     
-    if os.path.exists(target_dir):
-        shutil.rmtree(target_dir)
+    discard_directory(target_dir)
     
     try:
         result = subprocess.run(
-            ["git", "clone", "--depth", "1", github_url, target_dir],
-            capture_output=True,
+            ["git", "clone", "--depth", "1", "--no-tags", github_url, target_dir],
+            # A private or removed repository must fail, not wait for credentials
+            env={**os.environ, "GIT_TERMINAL_PROMPT": "0"},
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
             text=True,
             timeout=300
         )
@@ -76,21 +354,16 @@ def run_demo(venv_python: str, demo_path: str, repo_path: str) -> bool:
     print(f"\n--- Running Demo: {demo_path} ---")
     
     try:
+        # The demo writes straight to our stdout/stderr as it runs, so a long or
+        # chatty demo is neither held in memory nor silent until it exits.
+        print("Demo Output:")
+        sys.stdout.flush()
         result = subprocess.run(
             [venv_python, demo_path],
             cwd=repo_path,
-            capture_output=True,
-            text=True,
             timeout=600
         )
         
-        print("Demo Output:")
-        print(result.stdout)
-        
-        if result.stderr:
-            print("Demo Errors:")
-            print(result.stderr)
-        
         if result.returncode == 0:
             print("[SUCCESS] Demo completed successfully!")
             return True
@@ -6,12 +6,45 @@ dependencies from cloned repositories. It supports pyproject.toml, setup.py,
 and requirements.txt based projects.
 """
 
+import hashlib
 import os
 import sys
 import subprocess
 import shutil
+import tempfile
+import threading
+from collections import deque
+from functools import lru_cache
+from importlib import metadata
 from pathlib import Path
-from typing import Optional, Tuple, List
+from typing import Dict, Optional, Tuple, List
+
+from constants import PIP_CACHE_DIR
+from utils import discard_directory, load_pyproject
+
+# `uv` is a much faster drop-in for `python -m venv` and `pip install`.
+# When it is on PATH every venv creation and install goes through it.
+UV_EXECUTABLE = shutil.which("uv")
+
+# How much of a failed command's stderr is kept for error messages.
+STDERR_TAIL_LINES = 200
+
+# Seconds any single command may run before it is killed.
+COMMAND_TIMEOUT = 600
+
+# Layout of a venv's executables directory on this platform.
+_VENV_BIN = 'Scripts' if os.name == 'nt' else 'bin'
+_EXE_SUFFIX = '.exe' if os.name == 'nt' else ''
+
+# Large packages a venv may borrow from the host interpreter instead of
+# downloading them again (see create_virtual_environment).
+HOST_REUSABLE_PACKAGES = ("numpy", "scipy")
+
+# Written into a venv after a successful install; holds the key of what was installed.
+VENV_KEY_FILE = ".reproduce_key"
+
+# Files whose contents decide what gets installed into the venv.
+_DEPENDENCY_FILES = ("pyproject.toml", "setup.py", "setup.cfg", "requirements.txt")
 
 
 class VenvCreationError(Exception):
@@ -24,6 +57,43 @@ class DependencyInstallError(Exception):
     pass
 
 
+@lru_cache(maxsize=1)
+def _build_env() -> dict:
+    """
+    Environment used for every pip invocation.
+
+    Points pip at the persistent wheel/HTTP cache in PIP_CACHE_DIR
+    (~/.cache/reproduce-me/pip unless REPRODUCE_PIP_CACHE is set), which
+    survives tmp/ cleanup, and skips pip's self-version check, which is an
+    extra network round-trip per call.
+    Built once on first use and shared by all calls, so callers must not
+    mutate it.
+    """
+    env = os.environ.copy()
+    env["SETUPTOOLS_USE_DISTUTILS"] = "stdlib"
+    env.setdefault("PIP_CACHE_DIR", str(PIP_CACHE_DIR))
+    env["PIP_DISABLE_PIP_VERSION_CHECK"] = "1"
+    return env
+
+
+def _pip_command(venv_python: str, subcommand: str, *args: str) -> List[str]:
+    """
+    Build a pip command targeting the given venv interpreter.
+    
+    Uses `uv pip <subcommand> --python <venv_python>` when uv is available,
+    otherwise `<venv_python> -m pip <subcommand>`.
+    """
+    if UV_EXECUTABLE:
+        return [UV_EXECUTABLE, "pip", subcommand, "--python", venv_python, *args]
+    return [venv_python, "-m", "pip", subcommand, *args]
+
+
+def _install_options() -> List[str]:
+    """Common `pip install` options: prefer wheels, which are served from the shared cache."""
+    # uv always prefers wheels and does not accept --prefer-binary.
+    return [] if UV_EXECUTABLE else ["--prefer-binary"]
+
+
 def get_venv_python(venv_path: str) -> str:
     """
     Get the Python executable path inside a virtual environment.
@@ -34,10 +104,7 @@ def get_venv_python(venv_path: str) -> str:
     Returns:
         Path to the Python executable inside the venv.
     """
-    if os.name == 'nt':  # Windows
-        return os.path.join(venv_path, 'Scripts', 'python.exe')
-    else:  # Unix/macOS
-        return os.path.join(venv_path, 'bin', 'python')
+    return os.path.join(venv_path, _VENV_BIN, f"python{_EXE_SUFFIX}")
 
 
 def get_venv_pip(venv_path: str) -> str:
@@ -50,56 +117,194 @@ def get_venv_pip(venv_path: str) -> str:
     Returns:
         Path to the pip executable inside the venv.
     """
-    if os.name == 'nt': 
-        return os.path.join(venv_path, 'Scripts', 'pip.exe')
-    else: 
-        return os.path.join(venv_path, 'bin', 'pip')
+    return os.path.join(venv_path, _VENV_BIN, f"pip{_EXE_SUFFIX}")
 
 
 def run_command(
     cmd: List[str],
     cwd: Optional[str] = None,
     env: Optional[dict] = None,
-    description: str = "Command"
+    description: str = "Command",
+    capture_stdout: bool = False
 ) -> Tuple[int, str, str]:
     """
     Run a subprocess command with proper error handling.
     
+    stdout is discarded unless requested, and stderr is spooled to a temporary
+    file that is only read when the command fails. Even then only its last
+    STDERR_TAIL_LINES lines are kept, so long pip logs are never held in memory.
+    
     Args:
         cmd: Command and arguments as a list.
         cwd: Working directory for the command.
         env: Environment variables dictionary.
         description: Human-readable description of the command.
+        capture_stdout: Whether to capture and return stdout.
         
     Returns:
-        Tuple of (return_code, stdout, stderr)
+        Tuple of (return_code, stdout, stderr). stdout is "" unless captured,
+        stderr is "" on success and the tail of the output on failure.
     """
     try:
-        result = subprocess.run(
-            cmd,
-            cwd=cwd,
-            env=env,
-            capture_output=True,
-            text=True,
-            timeout=600  
-        )
-        return result.returncode, result.stdout, result.stderr
-    except subprocess.TimeoutExpired:
-        return -1, "", f"{description} timed out after 600 seconds"
+        with tempfile.TemporaryFile() as stderr_file:
+            with subprocess.Popen(
+                cmd,
+                cwd=cwd,
+                env=env,
+                stdout=subprocess.PIPE if capture_stdout else subprocess.DEVNULL,
+                stderr=stderr_file
+            ) as process:
+                # A timeout passed to run()/wait() is enforced by polling the child
+                # every few milliseconds for the whole install; a timer that kills
+                # it lets this thread block in a single wait instead.
+                timed_out = threading.Event()
+                
+                def expire() -> None:
+                    timed_out.set()
+                    process.kill()
+                
+                deadline = threading.Timer(COMMAND_TIMEOUT, expire)
+                deadline.start()
+                try:
+                    output, _ = process.communicate()
+                except BaseException:
+                    process.kill()
+                    raise
+                finally:
+                    deadline.cancel()
+            
+            if timed_out.is_set():
+                return -1, "", f"{description} timed out after {COMMAND_TIMEOUT} seconds"
+            
+            stderr = ""
+            if process.returncode != 0:
+                stderr_file.seek(0)
+                tail = deque(stderr_file, maxlen=STDERR_TAIL_LINES)
+                stderr = b"".join(tail).decode("utf-8", errors="replace")
+        
+        stdout = output.decode("utf-8", errors="replace") if capture_stdout else ""
+        return process.returncode, stdout, stderr
     except Exception as e:
         return -1, "", f"{description} failed with exception: {str(e)}"
 
 
+def _is_host_python(python_executable: Optional[str]) -> bool:
+    """Whether `python_executable` is the interpreter running this module."""
+    if python_executable is None:
+        return True
+    return os.path.realpath(python_executable) == os.path.realpath(sys.executable)
+
+
+def _host_package_versions(packages) -> List[str]:
+    """Return `name==version` for each of `packages` installed in the running interpreter."""
+    versions = []
+    for name in packages:
+        try:
+            versions.append(f"{name}=={metadata.version(name)}")
+        except metadata.PackageNotFoundError:
+            continue
+    return versions
+
+
+def _repo_requirements(repo_path: str) -> Optional[Dict[str, list]]:
+    """
+    Map each package the repository declares (requirements.txt and pyproject.toml
+    dependencies) to its parsed Requirement objects.
+
+    Returns None if `packaging` is unavailable or a requirement can't be parsed,
+    in which case no host package should be trusted.
+    """
+    try:
+        from packaging.requirements import InvalidRequirement, Requirement
+        from packaging.utils import canonicalize_name
+    except ImportError:
+        return None
+    
+    lines: List[str] = []
+    try:
+        lines.extend(Path(repo_path, "requirements.txt").read_text(encoding="utf-8").splitlines())
+    except OSError:
+        pass
+    pyproject_path = Path(repo_path, "pyproject.toml")
+    if pyproject_path.is_file():
+        lines.extend(extract_dependencies_from_pyproject(str(pyproject_path)))
+    
+    declared: Dict[str, list] = {}
+    for line in lines:
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        if line.startswith("-"):
+            # Options and nested/constraint files may pin anything
+            return None
+        try:
+            requirement = Requirement(line)
+        except InvalidRequirement:
+            return None
+        declared.setdefault(canonicalize_name(requirement.name), []).append(requirement)
+    return declared
+
+
+def _host_compatible_packages(repo_path: str, packages: List[str]) -> List[str]:
+    """
+    Those of `packages` installed in the running interpreter at a version the
+    repository's declared specifiers accept (an undeclared package accepts any).
+    """
+    declared = _repo_requirements(repo_path)
+    if declared is None:
+        return []
+    
+    from packaging.utils import canonicalize_name
+    
+    compatible = []
+    for name in packages:
+        try:
+            installed = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            continue
+        requirements = declared.get(canonicalize_name(name), [])
+        if all(
+            (req.marker is not None and not req.marker.evaluate())
+            or req.specifier.contains(installed, prereleases=True)
+            for req in requirements
+        ):
+            compatible.append(name)
+    return compatible
+
+
+def venv_includes_system_site_packages(venv_path: str) -> bool:
+    """Whether the venv was created with --system-site-packages, per its pyvenv.cfg."""
+    try:
+        with open(os.path.join(venv_path, "pyvenv.cfg"), encoding="utf-8") as f:
+            for line in f:
+                key, sep, value = line.partition("=")
+                if sep and key.strip() == "include-system-site-packages":
+                    return value.strip().lower() == "true"
+    except OSError:
+        pass
+    return False
+
+
 def create_virtual_environment(
     venv_path: str,
-    python_executable: Optional[str] = None
+    python_executable: Optional[str] = None,
+    reuse_host_packages: bool = False
 ) -> str:
     """
     Create a new virtual environment.
     
+    When the venv is built from the running interpreter and that interpreter
+    already has any of HOST_REUSABLE_PACKAGES, it is created with
+    --system-site-packages so those packages need not be downloaded again.
+    The tradeoff is isolation: everything else installed on the host becomes
+    importable in the venv too, although anything pip installs into the venv
+    still takes precedence.
+    
     Args:
         venv_path: Path where the virtual environment should be created.
         python_executable: Python interpreter to use. Defaults to sys.executable.
+        reuse_host_packages: Share the host's site-packages as above. Off by
+            default, since it weakens the venv's isolation.
         
     Returns:
         Path to the Python executable inside the created venv.
@@ -107,17 +312,31 @@ def create_virtual_environment(
     Raises:
         VenvCreationError: If venv creation fails.
     """
+    system_site_packages = (
+        reuse_host_packages
+        and _is_host_python(python_executable)
+        and bool(_host_package_versions(HOST_REUSABLE_PACKAGES))
+    )
+    
     if python_executable is None:
         python_executable = sys.executable
     
-    if os.path.exists(venv_path):
-        print(f"[INFO] Removing existing virtual environment at {venv_path}...")
-        shutil.rmtree(venv_path)
+    if discard_directory(venv_path):
+        print(f"[INFO] Removed existing virtual environment at {venv_path}.")
     
     print(f"[INFO] Creating virtual environment at {venv_path} using {python_executable}...")
     
+    if UV_EXECUTABLE:
+        # --seed keeps pip inside the venv for tools that call `python -m pip`.
+        venv_command = [UV_EXECUTABLE, "venv", "--seed", "--python", python_executable, venv_path]
+    else:
+        venv_command = [python_executable, "-m", "venv", venv_path]
+    if system_site_packages:
+        print("[INFO] Sharing the host interpreter's site-packages with the venv.")
+        venv_command.append("--system-site-packages")
+    
     returncode, stdout, stderr = run_command(
-        [python_executable, "-m", "venv", venv_path],
+        venv_command,
         description="venv creation"
     )
     
@@ -127,21 +346,34 @@ def create_virtual_environment(
     venv_python = get_venv_python(venv_path)
     if not os.path.exists(venv_python):
         raise VenvCreationError(f"Venv Python not found at {venv_python}")
+    # Follows the symlink to the base interpreter, so a dangling link fails here too
+    if not os.access(venv_python, os.X_OK):
+        raise VenvCreationError(f"Venv Python is not executable: {venv_python}")
     
-    returncode, stdout, stderr = run_command(
-        [venv_python, "--version"],
-        description="venv Python version check"
-    )
-    
-    if returncode != 0:
-        raise VenvCreationError(f"Venv Python not working: {stderr}")
-    
-    print(f"[INFO] Virtual environment Python: {stdout.strip()}")
+    print(f"[INFO] Virtual environment Python: {_venv_python_version(venv_path)}")
     print(f"[SUCCESS] Virtual environment created at {venv_path}")
     
     return venv_python
 
 
+def _venv_python_version(venv_path: str) -> str:
+    """
+    Read the interpreter version recorded in the venv's pyvenv.cfg.
+    
+    Both `python -m venv` and `uv venv` write it, which saves starting the
+    interpreter just to ask.
+    """
+    try:
+        with open(os.path.join(venv_path, "pyvenv.cfg"), encoding="utf-8") as f:
+            for line in f:
+                key, sep, value = line.partition("=")
+                if sep and key.strip() in ("version", "version_info"):
+                    return f"Python {value.strip()}"
+    except OSError:
+        pass
+    return "unknown version"
+
+
 def upgrade_build_tools(venv_python: str) -> None:
     """
     Upgrade pip, setuptools, and wheel in the virtual environment.
@@ -152,14 +384,15 @@ def upgrade_build_tools(venv_python: str) -> None:
     Raises:
         DependencyInstallError: If upgrade fails.
     """
-    print("[INFO] Upgrading pip, setuptools, and wheel in the virtual environment...")
+    # With uv doing the installs the venv's own pip is never run, so the
+    # version seeded by `uv venv --seed` is left as it is.
+    tools = ["setuptools", "wheel"] if UV_EXECUTABLE else ["pip", "setuptools", "wheel"]
+    print(f"[INFO] Upgrading {', '.join(tools)} in the virtual environment...")
     
-    env = os.environ.copy()
-    env["SETUPTOOLS_USE_DISTUTILS"] = "stdlib"
+    env = _build_env()
     
     returncode, stdout, stderr = run_command(
-        [venv_python, "-m", "pip", "install", "--upgrade", 
-         "pip", "setuptools", "wheel"],
+        _pip_command(venv_python, "install", "--upgrade", *tools),
         env=env,
         description="build tools upgrade"
     )
@@ -178,14 +411,31 @@ def preinstall_build_dependencies(venv_python: str, dependencies: List[str]) ->
         venv_python: Path to the venv's Python executable.
         dependencies: List of package names to pre-install.
     """
-    env = os.environ.copy()
-    env["SETUPTOOLS_USE_DISTUTILS"] = "stdlib"
+    env = _build_env()
     
     print(f"[INFO] Pre-installing critical build dependencies: {', '.join(dependencies)}...")
     
+    # One resolver run for the whole batch; only on failure fall back to
+    # per-package installs so one broken package doesn't block the rest.
+    returncode, stdout, stderr = run_command(
+        _pip_command(venv_python, "install", *_install_options(), *dependencies),
+        env=env,
+        description="pre-install build dependencies"
+    )
+    
+    if returncode == 0:
+        print(f"[SUCCESS] Pre-installed: {', '.join(dependencies)}.")
+        return
+    
+    if len(dependencies) == 1:
+        print(f"[WARNING] Failed to pre-install '{dependencies[0]}': {stderr[-200:]}")
+        return
+    
+    print("[WARNING] Batch pre-install failed, retrying packages individually...")
+    
     for dep in dependencies:
         returncode, stdout, stderr = run_command(
-            [venv_python, "-m", "pip", "install", "--no-cache-dir", dep],
+            _pip_command(venv_python, "install", *_install_options(), dep),
             env=env,
             description=f"pre-install {dep}"
         )
@@ -193,7 +443,7 @@ def preinstall_build_dependencies(venv_python: str, dependencies: List[str]) ->
         if returncode == 0:
             print(f"[SUCCESS] '{dep}' pre-installed.")
         else:
-            print(f"[WARNING] Failed to pre-install '{dep}': {stderr[:200]}")
+            print(f"[WARNING] Failed to pre-install '{dep}': {stderr[-200:]}")
 
 
 def detect_install_method(repo_path: str) -> str:
@@ -206,15 +456,20 @@ def detect_install_method(repo_path: str) -> str:
     Returns:
         One of: 'pyproject', 'setup', 'requirements', 'none'
     """
-    repo_path = Path(repo_path)
+    # One directory read answers all three checks below
+    try:
+        with os.scandir(repo_path) as entries:
+            names = {entry.name for entry in entries}
+    except OSError:
+        names = set()
     
-    if (repo_path / "pyproject.toml").exists():
+    if "pyproject.toml" in names:
         print("[INFO] Found pyproject.toml. Will install via `pip install .`.")
         return 'pyproject'
-    elif (repo_path / "setup.py").exists():
+    elif "setup.py" in names:
         print("[INFO] Found setup.py. Will install via `pip install .`.")
         return 'setup'
-    elif (repo_path / "requirements.txt").exists():
+    elif "requirements.txt" in names:
         print("[INFO] Found requirements.txt. Will install via `pip install -r requirements.txt`.")
         return 'requirements'
     else:
@@ -225,7 +480,8 @@ def detect_install_method(repo_path: str) -> str:
 def install_from_pyproject_or_setup(
     venv_python: str,
     repo_path: str,
-    editable: bool = False
+    editable: bool = False,
+    has_pyproject: Optional[bool] = None
 ) -> bool:
     """
     Install a package from pyproject.toml or setup.py.
@@ -234,17 +490,18 @@ def install_from_pyproject_or_setup(
         venv_python: Path to the venv's Python executable.
         repo_path: Path to the repository.
         editable: Whether to install in editable mode.
+        has_pyproject: Whether the repository has a pyproject.toml, if the
+            caller already knows; checked on disk when None.
         
     Returns:
         True if installation succeeded, False otherwise.
     """
-    env = os.environ.copy()
-    env["SETUPTOOLS_USE_DISTUTILS"] = "stdlib"
+    env = _build_env()
     
     if editable:
         print(f"[INFO] Attempting editable install from {repo_path}...")
         returncode, stdout, stderr = run_command(
-            [venv_python, "-m", "pip", "install", "--no-cache-dir", "-e", "."],
+            _pip_command(venv_python, "install", *_install_options(), "-e", "."),
             cwd=repo_path,
             env=env,
             description="editable install"
@@ -255,12 +512,12 @@ def install_from_pyproject_or_setup(
             return True
         else:
             print(f"[WARNING] Editable install failed, trying regular install...")
-            print(f"  Error: {stderr[:300]}")
+            print(f"  Error: {stderr[-300:]}")
     
     # Strategy 2: Regular install without build isolation
     print(f"[INFO] Installing dependencies using 'pip install .' from {repo_path}...")
     returncode, stdout, stderr = run_command(
-        [venv_python, "-m", "pip", "install", "--no-cache-dir", "--no-build-isolation", "."],
+        _pip_command(venv_python, "install", *_install_options(), "--no-build-isolation", "."),
         cwd=repo_path,
         env=env,
         description="regular install (no build isolation)"
@@ -270,11 +527,11 @@ def install_from_pyproject_or_setup(
         print("[SUCCESS] Package installed successfully.")
         return True
     
-    print(f"[WARNING] Regular install failed: {stderr[:300]}")
+    print(f"[WARNING] Regular install failed: {stderr[-300:]}")
     
     print("[INFO] Retrying with build isolation...")
     returncode, stdout, stderr = run_command(
-        [venv_python, "-m", "pip", "install", "--no-cache-dir", "."],
+        _pip_command(venv_python, "install", *_install_options(), "."),
         cwd=repo_path,
         env=env,
         description="install with build isolation"
@@ -284,15 +541,17 @@ def install_from_pyproject_or_setup(
         print("[SUCCESS] Package installed with build isolation.")
         return True
     
-    print(f"[WARNING] Build isolation install failed: {stderr[:300]}")
+    print(f"[WARNING] Build isolation install failed: {stderr[-300:]}")
     
     pyproject_path = Path(repo_path) / "pyproject.toml"
-    if pyproject_path.exists():
+    if has_pyproject is None:
+        has_pyproject = pyproject_path.exists()
+    if has_pyproject:
         print("[INFO] Attempting to extract and install dependencies from pyproject.toml...")
         deps = extract_dependencies_from_pyproject(str(pyproject_path))
         if deps:
             returncode, stdout, stderr = run_command(
-                [venv_python, "-m", "pip", "install", "--no-cache-dir"] + deps,
+                _pip_command(venv_python, "install", *_install_options(), *deps),
                 env=env,
                 description="install extracted dependencies"
             )
@@ -314,17 +573,10 @@ def extract_dependencies_from_pyproject(pyproject_path: str) -> List[str]:
         List of dependency strings.
     """
     try:
-        import tomllib
-    except ImportError:
-        try:
-            import tomli as tomllib
-        except ImportError:
+        data = load_pyproject(pyproject_path)
+        if data is None:
             print("[WARNING] Neither tomllib nor tomli available for parsing pyproject.toml")
             return []
-    
-    try:
-        with open(pyproject_path, "rb") as f:
-            data = tomllib.load(f)
         
         deps = []
         
@@ -342,25 +594,81 @@ def extract_dependencies_from_pyproject(pyproject_path: str) -> List[str]:
         return []
 
 
-def install_from_requirements(venv_python: str, repo_path: str) -> bool:
+def requirements_satisfied(requirements_file: str) -> bool:
+    """
+    Check whether the running interpreter already satisfies a requirements file.
+    
+    Args:
+        requirements_file: Path to a requirements.txt file.
+        
+    Returns:
+        True only if every requirement is installed at a matching version.
+        Unparseable lines (URLs, editable installs, options) count as unsatisfied.
+    """
+    try:
+        from packaging.requirements import InvalidRequirement, Requirement
+    except ImportError:
+        return False
+    
+    try:
+        lines = Path(requirements_file).read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return False
+    
+    checked = 0
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        
+        try:
+            requirement = Requirement(line)
+        except InvalidRequirement:
+            return False
+        
+        if requirement.marker is not None and not requirement.marker.evaluate():
+            continue
+        
+        try:
+            installed = metadata.version(requirement.name)
+        except metadata.PackageNotFoundError:
+            return False
+        
+        if not requirement.specifier.contains(installed, prereleases=True):
+            return False
+        
+        checked += 1
+    
+    return checked > 0
+
+
+def install_from_requirements(
+    venv_python: str,
+    repo_path: str,
+    extra_packages: Optional[List[str]] = None
+) -> bool:
     """
     Install dependencies from requirements.txt.
     
     Args:
         venv_python: Path to the venv's Python executable.
         repo_path: Path to the repository.
+        extra_packages: Additional packages resolved in the same pip invocation.
         
     Returns:
         True if installation succeeded, False otherwise.
     """
-    env = os.environ.copy()
-    env["SETUPTOOLS_USE_DISTUTILS"] = "stdlib"
+    env = _build_env()
     
     requirements_file = os.path.join(repo_path, "requirements.txt")
+    extra_packages = extra_packages or []
     
-    print(f"[INFO] Installing from requirements.txt...")
+    if extra_packages:
+        print(f"[INFO] Installing from requirements.txt together with: {', '.join(extra_packages)}...")
+    else:
+        print(f"[INFO] Installing from requirements.txt...")
     returncode, stdout, stderr = run_command(
-        [venv_python, "-m", "pip", "install", "--no-cache-dir", "-r", requirements_file],
+        _pip_command(venv_python, "install", *_install_options(), *extra_packages, "-r", requirements_file),
         env=env,
         description="requirements.txt install"
     )
@@ -369,24 +677,128 @@ def install_from_requirements(venv_python: str, repo_path: str) -> bool:
         print("[SUCCESS] Requirements installed successfully.")
         return True
     
-    print(f"[ERROR] Failed to install requirements: {stderr[:500]}")
+    print(f"[ERROR] Failed to install requirements: {stderr[-500:]}")
     return False
 
 
+def prepare_virtual_environment(
+    venv_path: str,
+    python_executable: Optional[str] = None,
+    reuse_host_packages: bool = False
+) -> str:
+    """
+    Create a virtual environment and upgrade its build tools.
+    
+    Nothing here depends on the repository, so callers can run it while the
+    repository is still being cloned and hand the result to
+    setup_venv_and_install.
+    
+    Args:
+        venv_path: Path where the virtual environment should be created.
+        python_executable: Python interpreter to use. Defaults to sys.executable.
+        reuse_host_packages: See create_virtual_environment.
+        
+    Returns:
+        Path to the Python executable inside the created venv.
+        
+    Raises:
+        VenvCreationError: If venv creation fails.
+    """
+    venv_python = create_virtual_environment(venv_path, python_executable, reuse_host_packages)
+    upgrade_build_tools(venv_python)
+    return venv_python
+
+
+def venv_install_key(
+    repo_path: str,
+    python_executable: Optional[str],
+    preinstall_deps: List[str],
+    reuse_host_packages: bool = False
+) -> str:
+    """
+    Hash everything that determines the contents of an installed venv.
+    
+    Covers the repository's dependency files and checked-out commit, the base
+    interpreter, the pre-installed packages and any host packages the venv
+    would borrow.
+    
+    Args:
+        repo_path: Path to the cloned repository.
+        python_executable: Python interpreter the venv is created from.
+        preinstall_deps: Packages installed ahead of the repository's own.
+        reuse_host_packages: See create_virtual_environment.
+        
+    Returns:
+        Hex digest identifying the install.
+    """
+    digest = hashlib.sha256()
+    digest.update(os.fsencode(python_executable or sys.executable))
+    digest.update("\0".join(sorted(preinstall_deps)).encode())
+    if reuse_host_packages and _is_host_python(python_executable):
+        digest.update("\0host\0".encode())
+        digest.update("\0".join(_host_package_versions(HOST_REUSABLE_PACKAGES)).encode())
+    
+    for name in _DEPENDENCY_FILES:
+        try:
+            content = (Path(repo_path) / name).read_bytes()
+        except OSError:
+            digest.update(f"\0{name}\0missing\0".encode())
+            continue
+        digest.update(f"\0{name}\0{len(content)}\0".encode())
+        digest.update(content)
+    
+    # `pip install .` also copies the package itself, so the source revision matters
+    returncode, stdout, _ = run_command(
+        ["git", "-C", str(repo_path), "rev-parse", "HEAD"],
+        description="git rev-parse",
+        capture_stdout=True
+    )
+    if returncode == 0:
+        digest.update(stdout.strip().encode())
+    
+    return digest.hexdigest()
+
+
+def venv_has_install_key(venv_path: str) -> bool:
+    """Whether the venv records a completed install that a later run may reuse."""
+    return os.path.isfile(os.path.join(venv_path, VENV_KEY_FILE))
+
+
+def _reusable_venv_python(venv_path: str, key: str) -> Optional[str]:
+    """Return the venv's Python if it was installed with `key` and is still executable, else None."""
+    try:
+        stored = Path(venv_path, VENV_KEY_FILE).read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    if stored != key:
+        return None
+    
+    venv_python = get_venv_python(venv_path)
+    return venv_python if os.access(venv_python, os.X_OK) else None
+
+
 def setup_venv_and_install(
     venv_path: str,
     repo_path: str,
     python_executable: Optional[str] = None,
-    preinstall_deps: Optional[List[str]] = None
+    preinstall_deps: Optional[List[str]] = None,
+    venv_python: Optional[str] = None,
+    reuse_host_packages: bool = False
 ) -> Tuple[bool, str]:
     """
     Main function to create venv and install all dependencies.
     
+    An existing venv whose recorded install key matches the repository is
+    reused as-is, skipping creation and installation entirely.
+    
     Args:
         venv_path: Path where the virtual environment should be created.
         repo_path: Path to the cloned repository.
         python_executable: Python interpreter to use. Defaults to sys.executable.
         preinstall_deps: List of packages to pre-install before main installation.
+        venv_python: Python of a venv already built by prepare_virtual_environment;
+            creation is skipped when given.
+        reuse_host_packages: See create_virtual_environment.
         
     Returns:
         Tuple of (success: bool, venv_python_path: str)
@@ -395,26 +807,48 @@ def setup_venv_and_install(
         preinstall_deps = ["numpy", "scipy"]
     
     try:
-        venv_python = create_virtual_environment(venv_path, python_executable)
+        install_key = venv_install_key(
+            repo_path, python_executable, preinstall_deps, reuse_host_packages
+        )
         
-        upgrade_build_tools(venv_python)
+        if venv_python is None:
+            reusable_python = _reusable_venv_python(venv_path, install_key)
+            if reusable_python:
+                print(f"[INFO] Dependencies unchanged since the last install; reusing {venv_path}.")
+                return True, reusable_python
+            venv_python = prepare_virtual_environment(
+                venv_path, python_executable, reuse_host_packages
+            )
         
-        if preinstall_deps:
-            preinstall_build_dependencies(venv_python, preinstall_deps)
+        if venv_includes_system_site_packages(venv_path):
+            # Only skip what the host provides at a version the repository accepts;
+            # anything else is installed into the venv, where it takes precedence.
+            provided = set(_host_compatible_packages(repo_path, preinstall_deps))
+            if provided:
+                print(f"[INFO] Using the host's {', '.join(sorted(provided))}; versions match the repository's requirements.")
+            preinstall_deps = [dep for dep in preinstall_deps if dep not in provided]
         
         install_method = detect_install_method(repo_path)
         
+        # Builds without isolation need the preinstalled packages up front; a plain
+        # requirements install can resolve them in the same pip run instead.
+        if preinstall_deps and install_method != 'requirements':
+            preinstall_build_dependencies(venv_python, preinstall_deps)
+        
         success = False
         
         if install_method in ('pyproject', 'setup'):
-            success = install_from_pyproject_or_setup(venv_python, repo_path)
+            success = install_from_pyproject_or_setup(
+                venv_python, repo_path, has_pyproject=(install_method == 'pyproject')
+            )
         elif install_method == 'requirements':
-            success = install_from_requirements(venv_python, repo_path)
+            success = install_from_requirements(venv_python, repo_path, extra_packages=preinstall_deps)
         else:
             print("[WARNING] No installation method detected. Venv created but no deps installed.")
             success = True
         
         if success:
+            Path(venv_path, VENV_KEY_FILE).write_text(install_key, encoding="utf-8")
             print(f"[SUCCESS] Virtual environment ready at: {venv_path}")
             return True, venv_python
         else:
@@ -6,10 +6,6 @@ sys.path.append(str(ROOT / "src"))
 from paper_extracter import PaperParser
 
 
-meow = PaperParser(str(ROOT / "test/paper1.pdf"))
-print(meow.extract_github_link())
-
-meow = PaperParser(str(ROOT / "test/paper2.pdf"))
-print(meow.extract_github_link())
-
-print(meow.extract_github_link(str(ROOT / "test/paper4.pdf")))
\ No newline at end of file
+for paper in sorted((ROOT / "test").glob("paper*.pdf")):
+    meow = PaperParser(str(paper))
+    print(meow.extract_github_link())
\ No newline at end of file
@@ -1,32 +1,61 @@
-import shutil
+import argparse
+import hashlib
 import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from pprint import pprint
 import sys
 import os
 
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT / "src"))
+
 # Import your extractor
-from src.requirements_extract import RequirementsExtractor
+from requirements_extract import RequirementsExtractor
+from utils import discard_directory
+
+# libgit2 clones in-process and releases the GIL during network I/O, so the
+# clone threads below avoid a git subprocess each; git stays as the fallback.
+try:
+    import pygit2
+except ImportError:
+    pygit2 = None
 
 # Where to store cloned repos + outputs
 BASE = Path("tmp_req_git_test")
 CLONE_DIR = BASE / "repos"
 OUT_DIR = BASE / "outputs"
+# Clones kept across runs, keyed by URL; CLONE_DIR only holds links into it
+CACHE_DIR = BASE / "cache"
 
 
 def reset(path: Path):
-    if path.exists():
-        shutil.rmtree(path)
+    # Renames old clones out of the way and deletes them in the background
+    discard_directory(path)
     path.mkdir(parents=True, exist_ok=True)
 
 
 def git_clone(repo_url: str, dest: Path) -> bool:
+    print(f"\n[CLONE] Cloning {repo_url} -> {dest}")
+    if pygit2 is not None:
+        try:
+            pygit2.clone_repository(repo_url, str(dest), depth=1)
+            print("[CLONE] Success.")
+            return True
+        except pygit2.GitError as e:
+            print(f"[CLONE] FAIL: {repo_url}")
+            print(e)
+            return False
+        except TypeError:
+            pass  # pygit2 < 1.14 cannot make shallow clones; use git below
+
     try:
-        print(f"\n[CLONE] Cloning {repo_url} -> {dest}")
         subprocess.run(
-            ["git", "clone", "--depth", "1", repo_url, str(dest)],
+            ["git", "clone", "--depth", "1", "--no-tags", repo_url, str(dest)],
             check=True,
-            stdout=subprocess.PIPE,
+            # Fail fast on private/removed repos instead of waiting on a credential prompt
+            env={**os.environ, "GIT_TERMINAL_PROMPT": "0"},
+            stdout=subprocess.DEVNULL,
             stderr=subprocess.PIPE,
             text=True
         )
@@ -38,7 +67,49 @@ def git_clone(repo_url: str, dest: Path) -> bool:
         return False
 
 
-def test_repo(url: str, idx: int):
+def git_refresh(repo_url: str, cached: Path) -> bool:
+    print(f"\n[CACHE] Refreshing {repo_url} in {cached}")
+    env = {**os.environ, "GIT_TERMINAL_PROMPT": "0"}
+    for cmd in (
+        ["git", "-C", str(cached), "fetch", "--depth", "1", "--no-tags", "origin", "HEAD"],
+        ["git", "-C", str(cached), "reset", "--hard", "FETCH_HEAD"],
+    ):
+        result = subprocess.run(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        if result.returncode != 0:
+            print(f"[CACHE] Refresh failed, using the cached copy: {result.stderr.strip()}")
+            return False
+    return True
+
+
+def clone_stage(url: str, idx: int, use_cache: bool = True) -> bool:
+    repo_local = CLONE_DIR / f"repo_{idx}"
+    if not use_cache:
+        return git_clone(url, repo_local)
+
+    key = hashlib.sha1(url.encode()).hexdigest()[:16]
+    cached = CACHE_DIR / key
+    if cached.is_dir():
+        git_refresh(url, cached)
+    else:
+        # Clone beside the cache and move it in only once complete, so an
+        # interrupted clone is never mistaken for a cached one
+        partial = CACHE_DIR / f".{key}.partial"
+        discard_directory(partial)
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        if not git_clone(url, partial):
+            discard_directory(partial)
+            return False
+        os.rename(partial, cached)
+
+    try:
+        os.symlink(cached.resolve(), repo_local, target_is_directory=True)
+    except OSError:
+        # e.g. Windows without symlink privileges
+        return git_clone(url, repo_local)
+    return True
+
+
+def extract_stage(url: str, idx: int):
     print("\n" + "=" * 80)
     print(f"[TEST] #{idx}  {url}")
     print("=" * 80)
@@ -46,12 +117,6 @@ def test_repo(url: str, idx: int):
     repo_local = CLONE_DIR / f"repo_{idx}"
     output_dir = OUT_DIR / f"repo_{idx}"
 
-    # 1. Clone repo ------------------------------------------
-    if not git_clone(url, repo_local):
-        print("[SKIP] Clone failed. Moving on.")
-        return
-
-    # 2. Extract dependencies ---------------------------------
     print("[EXTRACT] Running RequirementsExtractor...")
     extractor = RequirementsExtractor(repo_dir=repo_local, output_dir=output_dir)
     try:
@@ -68,19 +133,38 @@ def test_repo(url: str, idx: int):
     if req_file.exists():
         print(f"\n[FILE] requirements.txt saved at: {req_file.resolve()}")
         print("-------- FILE CONTENT --------")
-        print(req_file.read_text())
+        # Copy the raw bytes through; there's no need to decode just to re-encode
+        sys.stdout.flush()
+        sys.stdout.buffer.write(req_file.read_bytes())
+        sys.stdout.buffer.flush()
         print("------------------------------")
     else:
         print("[INFO] No requirements.txt generated.")
 
 
+def test_repo(url: str, idx: int):
+    # 1. Clone repo ------------------------------------------
+    if not clone_stage(url, idx):
+        print("[SKIP] Clone failed. Moving on.")
+        return
+
+    # 2. Extract dependencies ---------------------------------
+    extract_stage(url, idx)
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run RequirementsExtractor against real GitHub repositories.")
+    parser.add_argument("--no-cache", action="store_true", help="Clone every repository afresh instead of reusing cached clones.")
+    args = parser.parse_args()
+
     # Read GitHub URLs from a file OR inline list
     urls_file = Path("/Users/bilalwaraich/Desktop/CU Hackathon/Repoduce-Me/Repoduce-Me/src/github_test_list.txt")
 
     if urls_file.exists():
         print(f"[INFO] Loading GitHub URLs from: {urls_file}")
         urls = [u.strip() for u in urls_file.read_text().splitlines() if u.strip()]
+        # A repository listed twice would share one cached clone across threads
+        urls = list(dict.fromkeys(urls))
     else:
         print("[WARN] github_test_list.txt not found. Using fallback test repos.")
         urls = [
@@ -89,13 +173,20 @@ if __name__ == "__main__":
             "https://github.com/huggingface/transformers",
         ]
 
-    reset(BASE)
     reset(CLONE_DIR)
     reset(OUT_DIR)
 
     print(f"\n[INIT] Loaded {len(urls)} GitHub repositories to test.")
 
-    for i, url in enumerate(urls, start=1):
-        test_repo(url, i)
+    # Clones are network-bound, so run them concurrently and extract each repo
+    # as soon as its clone lands while the rest are still downloading.
+    with ThreadPoolExecutor(max_workers=max(1, min(16, len(urls)))) as pool:
+        clones = {pool.submit(clone_stage, url, i, not args.no_cache): (i, url) for i, url in enumerate(urls, start=1)}
+        for future in as_completed(clones):
+            i, url = clones[future]
+            if not future.result():
+                print(f"[SKIP] #{i} Clone failed. Moving on.")
+                continue
+            extract_stage(url, i)
 
     print("\n=== DONE: GitHub-based RequirementsExtractor tests complete ===")